@@ -18,14 +18,19 @@ from bots import util
 from constants.addresses import *
 from constants.channels import *
 from constants.config import *
-from data_access.contracts.util import is_valid_wallet_address
+from data_access.contracts.block_clock import get_block_clock
+from data_access.contracts.log_poller import get_log_poller
+from data_access.contracts.util import contract_call_cache, is_valid_wallet_address
+from data_access.contracts.well_reserves import get_well_reserve_engine
+from data_access.rpc_health import all_rpc_health
+from data_access.rpc_pool import all_endpoint_stats, shared_session_stats_str
 
 from monitors.beanstalk import BeanstalkMonitor
 from monitors.market import MarketMonitor
 from monitors.peg_cross import PegCrossMonitor
 from monitors.seasons import SeasonsMonitor
 from monitors.well import WellsMonitor
-from tools.util import embellish_token_emojis
+from tools.util import embellish_token_emojis, receipt_cache
 from tools.webhook_alerts import activate_webhook_on_error_logs
 
 class Channel(Enum):
@@ -177,6 +182,21 @@ class DiscordClient(discord.ext.commands.Bot):
                 logging.info(f"Market Monitor last update:         {datetime.datetime.fromtimestamp(self.market_monitor.last_check_time)}")
                 logging.info(f"Integrations Monitor last update:   {datetime.datetime.fromtimestamp(self.integrations_monitor.last_check_time)}")
                 logging.info(f"Peg Monitor last update:            {datetime.datetime.fromtimestamp(self.peg_cross_monitor.last_check_time)}")
+                logging.info(f"Well pipeline:                      {self.well_monitor_whitelisted._pipeline.stats_str()}")
+                logging.info(f"Beanstalk pipeline:                 {self.beanstalk_monitor._pipeline.stats_str()}")
+                logging.info(f"Market pipeline:                    {self.market_monitor._pipeline.stats_str()}")
+                logging.info(f"Integrations pipeline:              {self.integrations_monitor._pipeline.stats_str()}")
+                logging.info(f"Receipt cache:                      {receipt_cache.stats_str()}")
+                logging.info(f"Contract call cache:                {contract_call_cache.stats_str()}")
+                for rpc_health in all_rpc_health():
+                    logging.info(f"RPC health:                         {rpc_health.status_str()}")
+                for endpoint_stats in all_endpoint_stats():
+                    logging.info(f"RPC latency:                        {endpoint_stats.status_str()}")
+                logging.info(f"RPC connections:                    {shared_session_stats_str()}")
+                logging.info(f"Log stream:                         {get_log_poller().stream_status_str()}")
+                if get_well_reserve_engine():
+                    logging.info(f"Well reserves:                      {get_well_reserve_engine().status_str()}")
+                logging.info(f"Block clock:                        {get_block_clock().status_str()}")
             except Exception as e:
                 logging.error("Error in monitor status logging", exc_info=True)
             time.sleep(60)
@@ -8,6 +8,7 @@ import re
 import discord
 from discord.ext import tasks, commands
 
+from data_access.contracts.decoded_receipt import get_decoded_receipt
 from data_access.contracts.util import *
 from data_access.addresses import format_address_ens, shorten_hash
 from tools.util import get_txn_receipt
@@ -125,9 +126,8 @@ def event_in_logs(name, event_logs):
 
 
 def remove_events_from_logs_by_name(name, event_logs):
-    for event_log in event_logs[:]:
-        if event_log.event == name:
-            event_logs.remove(event_log)
+    # Filter in place in a single pass, callers rely on the list itself being modified.
+    event_logs[:] = [event_log for event_log in event_logs if event_log.event != name]
 
 
 def event_sig_in_txn(event_sig, txn_hash, web3=None):
@@ -148,11 +148,8 @@ def event_sig_in_txn(event_sig, txn_hash, web3=None):
 def get_logs_by_names(names, event_logs):
     if type(names) == str:
         names = [names]
-    events = []
-    for event_log in event_logs:
-        if event_log.event in names:
-            events.append(event_log)
-    return events
+    names = set(names)
+    return [event_log for event_log in event_logs if event_log.event in names]
 
 
 def sig_compare(signature, signatures):
@@ -226,9 +223,9 @@ def value_to_emojis(value):
     return "🐳" * min(50, value // 100000)
 
 
-def latest_pool_price_str(bean_client, addr):
+def latest_pool_price_str(bean_client, addr, pool_info=None):
     addr = Web3.to_checksum_address(addr)
-    pool_info = bean_client.get_pool_info(addr)
+    pool_info = pool_info or bean_client.get_pool_info(addr)
     if addr == BEAN_ADDR:
         type_str = "Pinto"
     else:
@@ -312,7 +309,7 @@ def links_footer(txn_receipt, farmer=None):
     txn_hash = txn_receipt.transactionHash.hex()
 
     # This approach is correct if we assume one tractor operator per txn
-    evt_tractor = beanstalk_contract.events["Tractor"]().processReceipt(txn_receipt, errors=DISCARD)
+    evt_tractor = get_decoded_receipt(txn_receipt).events("Tractor")
     operator = evt_tractor[0].args.operator if bool(evt_tractor) else None
 
     operator_str = ""
@@ -19,6 +19,7 @@ USDC = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
 WSTETH = "0xc1CBa3fCea344f92D9239c08C0568f6F2F0ee452"
 
 NULL_ADDR = "0x0000000000000000000000000000000000000000"
+MULTICALL3_ADDR = "0xcA11bde05977b3631167028862bE2a173976CA11"
 
 # Something that will never match
 UNRIPE_TOKEN_PREFIX = "0x123456789"
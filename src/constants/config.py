@@ -42,10 +42,24 @@ DISCORD_NICKNAME_LIMIT = 32
 # For WalletMonitoring - I dont think this is actually used
 WALLET_WATCH_LIMIT = 10
 
-RPC_URL = "https://" + os.environ["RPC_URL"]
-if "localhost" in RPC_URL:
-    RPC_URL = RPC_URL.replace("https", "http")
+def _rpc_url_from_env(url):
+    url = "https://" + url.strip()
+    if "localhost" in url:
+        url = url.replace("https", "http")
+    return url
+
+# RPC_URL may contain several comma separated urls, requests are routed to the healthiest one.
+RPC_URLS = [_rpc_url_from_env(url) for url in os.environ["RPC_URL"].split(",")]
+RPC_URL = RPC_URLS[0]
+# Optional endpoint used for heavy historical queries.
+ARCHIVE_RPC_URL = _rpc_url_from_env(os.environ["ARCHIVE_RPC_URL"]) if os.environ.get("ARCHIVE_RPC_URL") else None
 ENS_RPC_URL = os.environ["ENS_RPC_URL"]
+# Number of recent requests per endpoint used to compute its latency and error rate.
+RPC_POOL_STATS_WINDOW = 200
+# Cost (in seconds) attributed to a failed request when ranking endpoints.
+RPC_POOL_ERROR_PENALTY = 5
+# Maximum number of open keep-alive connections per RPC host, shared by all threads.
+RPC_HTTP_POOL_SIZE = 32
 
 # Decimals for conversion from chain int values to float decimal values.
 ETH_DECIMALS = 18
@@ -60,6 +74,91 @@ WELL_LP_DECIMALS = 18
 # Number of txn hashes to keep in memory to prevent duplicate processing.
 TXN_MEMORY_SIZE_LIMIT = 100
 
+# Shared limits applied to each RPC endpoint. Rate limit is in requests per second.
+RPC_RATE_LIMIT = 25
+RPC_RATE_BURST = 50
+# Consecutive failures after which all requests to an endpoint are paused, and for how long (in seconds).
+RPC_CIRCUIT_FAILURE_THRESHOLD = 10
+RPC_CIRCUIT_RESET_TIMEOUT = 30
+# Bounds of the jittered exponential backoff between retries of failed requests (in seconds).
+RPC_BACKOFF_BASE = 0.5
+RPC_BACKOFF_MAX = 30
+
+# Number of txn receipts to keep in memory, shared by all monitors.
+RECEIPT_CACHE_SIZE = 500
+# Maximum number of receipts requested in a single JSON-RPC batch request.
+RECEIPT_BATCH_SIZE = 100
+
+# Number of recent blocks whose enrichment snapshot (prices, bdvs, liquidity) is kept for events in the same block.
+BLOCK_SNAPSHOT_CACHE_SIZE = 16
+
+# Number of contract call results at numbered blocks to keep in memory. Oldest blocks are evicted first.
+CONTRACT_CALL_CACHE_SIZE = 5000
+
+# Time between eth_blockNumber queries of the shared block clock (in seconds). Base produces a block every 2s.
+BLOCK_CLOCK_INTERVAL = 1
+
+# Minimum time between eth_getLogs queries of the shared log poller (in seconds).
+LOG_POLL_MIN_INTERVAL = 5
+# Maximum number of blocks to request in a single eth_getLogs query of the shared log poller.
+LOG_POLL_MAX_BLOCK_RANGE = 500
+# How new logs are ingested. "stream" pushes logs from an eth_subscribe websocket subscription as soon as they
+# are emitted, with polling as backfill. "poll" only polls.
+LOG_INGESTION_MODE = os.environ.get("LOG_INGESTION_MODE", "stream")
+# Minimum time between backfill eth_getLogs queries while the log stream is connected (in seconds).
+LOG_STREAM_POLL_INTERVAL = 30
+
+# Historical log backfill (get_log_range). Chunks are sized to return about LOG_BACKFILL_TARGET_RESULTS entries
+# each, and are queried concurrently by up to LOG_BACKFILL_WORKERS threads.
+LOG_BACKFILL_WORKERS = 4
+LOG_BACKFILL_TARGET_RESULTS = 2000
+LOG_BACKFILL_INITIAL_BLOCK_RANGE = 2000
+LOG_BACKFILL_MAX_BLOCK_RANGE = 50000
+
+# SQLite file holding the last fully processed block of each EthEventsClient, so restarts resume where they stopped.
+# The logs directory is a mounted volume in docker. Set BLOCK_CURSOR_DB_PATH to an empty string to disable.
+BLOCK_CURSOR_DB_PATH = os.environ.get("BLOCK_CURSOR_DB_PATH", "logs/block_cursors.db")
+# Maximum number of missed blocks to catch up on after a restart (~1 hour of Base blocks).
+BLOCK_CURSOR_MAX_CATCHUP = int(os.environ.get("BLOCK_CURSOR_MAX_CATCHUP", 1800))
+
+# Txns of a monitor processed concurrently. Messages are still sent in on-chain order.
+MONITOR_PIPELINE_WORKERS = 4
+# Maximum number of txns of a monitor waiting, processing or awaiting their turn to send before ingestion blocks.
+MONITOR_PIPELINE_QUEUE_SIZE = 64
+# Well txns valued concurrently by each WellsMonitor.
+WELL_PIPELINE_WORKERS = 25
+# Time allowed to value a well txn (in seconds) before a reduced message is sent in its place.
+WELL_TXN_TIMEOUT = 60
+
+# JSON file holding the static metadata of all wells bored by the Aquifer and their tokens.
+# Set WELL_REGISTRY_PATH to an empty string to disable persistence.
+WELL_REGISTRY_PATH = os.environ.get("WELL_REGISTRY_PATH", "logs/well_registry.json")
+# Timestamp of Base block 0, Base produces a block every 2s since genesis.
+BASE_GENESIS_TIMESTAMP = 1686789347
+# Block to backfill Aquifer BoreWell events from when there is no persisted registry. Defaults to one day before the
+# deployment of Basin (block 22622226), as the Aquifer was deployed ahead of the wells.
+AQUIFER_DEPLOY_BLOCK = int(os.environ.get(
+    "AQUIFER_DEPLOY_BLOCK", (BASIN_DEPLOY_EPOCH - BASE_GENESIS_TIMESTAMP) // 2 - 24 * 60 * 60 // 2
+))
+# Well tokens whose ERC-20 metadata is requested in a single multicall.
+WELL_REGISTRY_MULTICALL_SIZE = 50
+
+# Price the wells locally from reserves tracked with their events, rather than querying the price contract per alert.
+LOCAL_WELL_PRICING = os.environ.get("LOCAL_WELL_PRICING", "true").lower() == "true"
+# Blocks between checks of the locally tracked reserves against the price contract. Token USD prices are recalibrated at each check.
+WELL_RESERVES_CHECK_BLOCKS = 150
+# Number of recent blocks with well events whose locally computed prices are kept.
+WELL_RESERVES_HISTORY_BLOCKS = 300
+# Time to wait for the events of a block to be applied before falling back to the price contract (in seconds).
+WELL_RESERVES_WAIT = 2
+# Relative difference between the local and on-chain deltaB of a well (to its bean reserve) above which the well is
+# refitted or served by the price contract.
+WELL_RESERVES_DRIFT_TOLERANCE = 0.001
+# Relative difference between the local and on-chain bean price of a well at a check above which a warning is logged.
+WELL_RESERVES_PRICE_TOLERANCE = 0.01
+# Initial amplification parameter of Stable2 wells, refitted against the price contract when deltaB disagrees.
+STABLE2_A = 1
+
 # Newline character to get around limits of f-strings.
 NEWLINE_CHAR = "\n"
 
@@ -0,0 +1,77 @@
+import logging
+import os
+import sqlite3
+import sys
+import threading
+
+from constants.config import *
+
+class BlockCursorStore:
+    """Last fully processed block of each event client, persisted in a local SQLite file.
+
+    Txns already processed in later blocks are stored along with it, so that they are not replayed on restart.
+    Several bot processes may share the same file, each write is its own transaction.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS block_cursors ("
+                "key TEXT PRIMARY KEY, block_number INTEGER NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS processed_txns ("
+                "key TEXT NOT NULL, txn_hash TEXT NOT NULL, block_number INTEGER NOT NULL, PRIMARY KEY (key, txn_hash))"
+            )
+
+    def get(self, key):
+        """Last block stored for key, or None if there is none."""
+        with self._lock:
+            row = self._conn.execute("SELECT block_number FROM block_cursors WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def processed_txns(self, key):
+        """Txns stored for key as processed after its block, as {txn hash: block number}."""
+        with self._lock:
+            rows = self._conn.execute("SELECT txn_hash, block_number FROM processed_txns WHERE key = ?", (key,)).fetchall()
+        return {txn_hash: block_number for txn_hash, block_number in rows}
+
+    def set(self, key, block_number, processed_txns={}):
+        """Store block_number for key, along with the processed txns of later blocks as {txn hash: block number}."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO block_cursors (key, block_number, updated_at) VALUES (?, ?, strftime('%s', 'now'))",
+                (key, block_number)
+            )
+            self._conn.execute("DELETE FROM processed_txns WHERE key = ?", (key,))
+            self._conn.executemany(
+                "INSERT INTO processed_txns (key, txn_hash, block_number) VALUES (?, ?, ?)",
+                [(key, txn_hash, block) for txn_hash, block in processed_txns.items() if block > block_number]
+            )
+
+def cursor_namespace():
+    """Name of the running bot, so that separate processes sharing the store keep separate cursors."""
+    if os.environ.get("BLOCK_CURSOR_NAMESPACE"):
+        return os.environ["BLOCK_CURSOR_NAMESPACE"]
+    return os.path.splitext(os.path.basename(sys.argv[0]))[0] or "default"
+
+_block_cursor_store = None
+_block_cursor_store_failed = False
+_block_cursor_store_lock = threading.Lock()
+def get_block_cursor_store():
+    """Get the process-wide BlockCursorStore, or None if persistence is disabled or unavailable."""
+    global _block_cursor_store, _block_cursor_store_failed
+    with _block_cursor_store_lock:
+        if _block_cursor_store is None and BLOCK_CURSOR_DB_PATH and not _block_cursor_store_failed:
+            try:
+                _block_cursor_store = BlockCursorStore(BLOCK_CURSOR_DB_PATH)
+            except (sqlite3.Error, OSError) as e:
+                logging.warning(f"Block cursor store unavailable at {BLOCK_CURSOR_DB_PATH}, restarts will not catch up.\n{e}")
+                _block_cursor_store_failed = True
+        return _block_cursor_store
@@ -1,5 +1,7 @@
 from abc import abstractmethod
 
+import numpy as np
+
 from data_access.contracts.util import *
 
 class BeanClient(ChainClient):
@@ -24,6 +26,21 @@ class BeanClient(ChainClient):
         raw_price_info = call_contract_function_with_retry(self.price_contract.functions.priceForWells(wells), block_number=block_number)
         return BeanClient.map_price_info(raw_price_info)
 
+    def get_price_info_with_wells(self, wells, block_number=None):
+        """Get the overall pricing info and the pricing info of the given wells together in a single call."""
+        block_number = block_number or self.block_number
+        raw_price_info, raw_wells_price_info = call_contract_functions_with_retry([
+            self.price_contract.functions.price(),
+            self.price_contract.functions.priceForWells(wells)
+        ], block_number=block_number)
+        return BeanClient.map_price_info(raw_price_info), BeanClient.map_price_info(raw_wells_price_info)
+
+    def get_wells_price_arrays(self, wells, block_number=None):
+        """Get the pricing info of the given wells at one block in a single call, as WellsPriceArrays."""
+        block_number = block_number or self.block_number
+        pool_infos = self.get_price_for_wells(wells, block_number=block_number)["pool_infos"]
+        return WellsPriceArrays([pool_infos[well] for well in wells])
+
     @abstractmethod
     def map_price_info(raw_price_info):
         price_dict = {}
@@ -85,3 +102,33 @@ class BeanClient(ChainClient):
         block_number = block_number or self.block_number
         raw_price_info = call_contract_function_with_retry(self.price_contract.functions.price(), block_number=block_number)
         return bean_to_float(BeanClient.map_price_info(raw_price_info)["price"])
+
+class WellsPriceArrays:
+    """Pricing info of several wells at one block, as float arrays aligned with pool_infos.
+
+    Amounts are converted from 6 decimals once, so that aggregates and reports are computed over whole arrays.
+    """
+
+    def __init__(self, pool_infos):
+        self.pool_infos = pool_infos
+        self.pools = [pool_info["pool"] for pool_info in pool_infos]
+        self.price = WellsPriceArrays._field_array(pool_infos, "price")
+        self.liquidity = WellsPriceArrays._field_array(pool_infos, "liquidity")
+        self.delta_b = WellsPriceArrays._field_array(pool_infos, "delta_b")
+        self.lp_usd = WellsPriceArrays._field_array(pool_infos, "lp_usd")
+
+    def total_liquidity(self):
+        return float(self.liquidity.sum())
+
+    def in_wells(self, wells):
+        """Boolean mask of the wells that are in the given list."""
+        wells = set(wells)
+        return np.array([pool in wells for pool in self.pools], dtype=bool)
+
+    def by_liquidity(self):
+        """Indices of the wells, highest liquidity first."""
+        return np.argsort(-self.liquidity, kind="stable")
+
+    @staticmethod
+    def _field_array(pool_infos, field):
+        return np.array([pool_info[field] for pool_info in pool_infos], dtype=np.float64) / 10 ** BEAN_DECIMALS
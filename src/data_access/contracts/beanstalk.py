@@ -112,15 +112,34 @@ class BeanstalkClient(ChainClient):
 
     def get_podline_length(self, field_id=0, block_number=None):
         block_number = block_number or self.block_number
-        pod_index = call_contract_function_with_retry(self.contract.functions.podIndex(field_id), block_number=block_number)
-        harvestable_index = call_contract_function_with_retry(self.contract.functions.harvestableIndex(field_id), block_number=block_number)
+        pod_index, harvestable_index = call_contract_functions_with_retry([
+            self.contract.functions.podIndex(field_id),
+            self.contract.functions.harvestableIndex(field_id)
+        ], block_number=block_number)
         return bean_to_float(pod_index - harvestable_index)
 
+    def get_field_info(self, field_id=0, block_number=None):
+        """Returns the max temperature, remaining soil and podline length together in a single call."""
+        block_number = block_number or self.block_number
+        max_temp, soil, pod_index, harvestable_index = call_contract_functions_with_retry([
+            self.contract.functions.maxTemperature(),
+            self.contract.functions.totalSoil(),
+            self.contract.functions.podIndex(field_id),
+            self.contract.functions.harvestableIndex(field_id)
+        ], block_number=block_number)
+        return {
+            "max_temp": max_temp / 10 ** 6,
+            "current_soil": soil / 10 ** 6,
+            "podline_length": bean_to_float(pod_index - harvestable_index)
+        }
+
     def get_deposited_bdv_totals(self, block_number=None):
         """Returns the total recorded bdv of each silo asset"""
         block_number = block_number or self.block_number
-        silo_tokens = call_contract_function_with_retry(self.contract.functions.getWhitelistedTokens(), block_number=block_number)
-        total_bdvs = call_contract_function_with_retry(self.contract.functions.getTotalSiloDepositedBdv(), block_number=block_number)
+        silo_tokens, total_bdvs = call_contract_functions_with_retry([
+            self.contract.functions.getWhitelistedTokens(),
+            self.contract.functions.getTotalSiloDepositedBdv()
+        ], block_number=block_number)
 
         retval = {}
         for i in range(len(silo_tokens)):
@@ -0,0 +1,84 @@
+import logging
+import threading
+import time
+
+from data_access.contracts.util import *
+
+class BlockClock:
+    """Process-wide tracker of the chain head.
+
+    A single thread polls eth_blockNumber every BLOCK_CLOCK_INTERVAL seconds. Listeners are called from that
+    thread with each new block number, and any thread can block until a new block exists.
+    """
+
+    def __init__(self, interval=BLOCK_CLOCK_INTERVAL):
+        self.interval = interval
+        self.block_number = None
+        self.last_block_time = None
+        self._listeners = []
+        self._new_block = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._started = False
+
+    def start(self):
+        with self._new_block:
+            if self._started:
+                return
+            self._started = True
+        logging.info(f"Starting block clock ({self.interval}s interval)")
+        self._thread.start()
+
+    def add_listener(self, listener):
+        """Call listener(block_number) from the clock thread on every new block. Listeners must not block for long."""
+        with self._new_block:
+            self._listeners.append(listener)
+
+    def wait_for_block(self, after_block, timeout):
+        """Block until the head is past after_block, or the timeout (in seconds) elapses. Returns the head."""
+        with self._new_block:
+            self._new_block.wait_for(
+                lambda: self.block_number is not None and (after_block is None or self.block_number > after_block),
+                timeout
+            )
+            return self.block_number
+
+    def status_str(self):
+        if self.block_number is None:
+            return "no blocks yet"
+        return f"block {self.block_number}, {time.time() - self.last_block_time:.1f}s since last new block"
+
+    def _run(self):
+        try_count = 0
+        web3 = get_web3_instance()
+        while True:
+            try:
+                block_number = web3.eth.block_number
+                try_count = 0
+            except Exception as e:
+                try_count += 1
+                logging.warning(f"Block clock failed to get the block number.\n{e}")
+                rpc_backoff(web3, try_count)
+                continue
+            if block_number != self.block_number:
+                with self._new_block:
+                    self.block_number = block_number
+                    self.last_block_time = time.time()
+                    listeners = list(self._listeners)
+                    self._new_block.notify_all()
+                for listener in listeners:
+                    try:
+                        listener(block_number)
+                    except Exception as e:
+                        logging.warning(f"Block clock listener failed on block {block_number}.\n{e}", exc_info=True)
+            time.sleep(self.interval)
+
+_block_clock = None
+_block_clock_lock = threading.Lock()
+def get_block_clock():
+    """Get the process-wide BlockClock, started on first use."""
+    global _block_clock
+    with _block_clock_lock:
+        if _block_clock is None:
+            _block_clock = BlockClock()
+            _block_clock.start()
+    return _block_clock
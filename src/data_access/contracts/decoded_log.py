@@ -0,0 +1,125 @@
+from web3._utils.events import get_event_data
+
+class DecodedLog:
+    """Immutable decoded event log, sharing a reference to the receipt of its txn.
+
+    Replaces the per log AttributeDict copies of web3 event data. Supports the same attribute, item and
+    .get() access, so existing handlers using .event, .args, .logIndex or .get("address") are unaffected.
+
+    The event is identified by topic0 only. Its args are decoded from the raw log on first access and memoized.
+    """
+
+    FIELDS = (
+        "event",
+        "args",
+        "address",
+        "logIndex",
+        "transactionIndex",
+        "transactionHash",
+        "blockHash",
+        "blockNumber",
+        "receipt",
+    )
+    __slots__ = (
+        "event",
+        "address",
+        "logIndex",
+        "transactionIndex",
+        "transactionHash",
+        "blockHash",
+        "blockNumber",
+        "receipt",
+        "_args",
+        "_codec",
+        "_event_abi",
+        "_raw_log",
+    )
+
+    def __init__(self, event, address, logIndex, transactionIndex, transactionHash, blockHash, blockNumber, receipt,
+                 args=None, codec=None, event_abi=None, raw_log=None):
+        set_slot = object.__setattr__
+        set_slot(self, "event", event)
+        set_slot(self, "address", address)
+        set_slot(self, "logIndex", logIndex)
+        set_slot(self, "transactionIndex", transactionIndex)
+        set_slot(self, "transactionHash", transactionHash)
+        set_slot(self, "blockHash", blockHash)
+        set_slot(self, "blockNumber", blockNumber)
+        set_slot(self, "receipt", receipt)
+        set_slot(self, "_args", args)
+        set_slot(self, "_codec", codec)
+        set_slot(self, "_event_abi", event_abi)
+        set_slot(self, "_raw_log", raw_log)
+
+    @classmethod
+    def from_event_data(cls, event_data, receipt):
+        """Wrap the event data returned by web3's get_event_data."""
+        return cls(
+            event_data["event"],
+            event_data["address"],
+            event_data["logIndex"],
+            event_data["transactionIndex"],
+            event_data["transactionHash"],
+            event_data["blockHash"],
+            event_data["blockNumber"],
+            receipt,
+            args=event_data["args"],
+        )
+
+    @classmethod
+    def from_log(cls, codec, event_abi, log, receipt):
+        """Wrap a raw receipt log, deferring decoding of its args.
+
+        Returns None if the log cannot be an instance of the event (topic count does not match the indexed inputs).
+        """
+        indexed_count = sum(1 for abi_input in event_abi["inputs"] if abi_input.get("indexed"))
+        if len(log["topics"]) != indexed_count + 1:
+            return None
+        return cls(
+            event_abi["name"],
+            log["address"],
+            log["logIndex"],
+            log["transactionIndex"],
+            log["transactionHash"],
+            log["blockHash"],
+            log["blockNumber"],
+            receipt,
+            codec=codec,
+            event_abi=event_abi,
+            raw_log=log,
+        )
+
+    @property
+    def args(self):
+        if self._args is None:
+            object.__setattr__(self, "_args", get_event_data(self._codec, self._event_abi, self._raw_log)["args"])
+        return self._args
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DecodedLog is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("DecodedLog is immutable")
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def keys(self):
+        return self.FIELDS
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.FIELDS]
+
+    def __repr__(self):
+        return f"DecodedLog({self.event} at {self.transactionHash.hex()}:{self.logIndex})"
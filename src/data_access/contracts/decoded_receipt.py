@@ -0,0 +1,139 @@
+import threading
+from collections import OrderedDict
+
+from eth_abi.exceptions import DecodingError
+from eth_utils import event_abi_to_log_topic
+from web3.exceptions import InvalidEventABI, LogTopicError, MismatchedABI
+
+from data_access.contracts.decoded_log import DecodedLog
+from data_access.contracts.util import *
+
+def event_abis_by_topic(abi):
+    """Map topic0 of each event in the contract abi to its event abi."""
+    return {
+        "0x" + event_abi_to_log_topic(event_abi).hex(): event_abi
+        for event_abi in abi
+        if event_abi.get("type") == "event" and not event_abi.get("anonymous")
+    }
+
+# Topic map of each contract abi passed to DecodedReceipt.events(), keyed by id of the abi list.
+# The abi list is kept alongside so that its id cannot be reused.
+_event_abis_by_contract_abi = {}
+def _cached_event_abis_by_topic(abi):
+    if id(abi) not in _event_abis_by_contract_abi:
+        _event_abis_by_contract_abi[id(abi)] = (abi, event_abis_by_topic(abi))
+    return _event_abis_by_contract_abi[id(abi)][1]
+
+# All known event abis. When several contracts define an event with the same topic0, the first one listed wins.
+KNOWN_EVENT_ABIS = {}
+for _abi in [
+    beanstalk_abi,
+    well_abi,
+    aquifer_abi,
+    fertilizer_abi,
+    wrapped_silo_erc20_abi,
+    spectra_abi,
+    legacy_spectra_abi,
+    erc20_abi,
+    erc1155_abi,
+]:
+    for _topic, _event_abi in event_abis_by_topic(_abi).items():
+        KNOWN_EVENT_ABIS.setdefault(_topic, _event_abi)
+
+class DecodedReceipt:
+    """All known events of one txn receipt, decoded at most once per event abi and shared by every helper.
+
+    Like web3's processReceipt, events are matched by topic0 regardless of the emitting address. As with its
+    DISCARD error flag, logs that fail to decode are dropped, so handlers never see a decoding error. Each log is
+    decoded once per event abi. Get the shared instance of a receipt with get_decoded_receipt().
+    """
+
+    def __init__(self, receipt):
+        self.receipt = receipt
+        self._codec = get_web3_instance().codec
+        # Position in receipt.logs of the logs with each topic0.
+        self._positions_by_topic = {}
+        for position, log in enumerate(receipt.logs):
+            if len(log.topics) > 0:
+                self._positions_by_topic.setdefault(log.topics[0].hex(), []).append(position)
+        # DecodedLog of each (position, id(event abi)), None if the log does not fit the event abi.
+        self._decoded = {}
+        self._lock = threading.Lock()
+
+    def events(self, names, abi=None):
+        """Logs of the named events, in logIndex order.
+
+        Args:
+            names: event name or list of event names.
+            abi: contract abi defining the events. Defaults to all known abis. Needed when the arg names
+                of an event differ between contracts, e.g. ERC-1155 TransferSingle in the Beanstalk abi.
+        """
+        if type(names) == str:
+            names = [names]
+        names = set(names)
+        event_abis = _cached_event_abis_by_topic(abi) if abi is not None else KNOWN_EVENT_ABIS
+        decoded_logs = []
+        for topic, event_abi in event_abis.items():
+            if event_abi["name"] in names:
+                for position in self._positions_by_topic.get(topic, []):
+                    decoded_log = self._decode(position, event_abi)
+                    if decoded_log is not None:
+                        decoded_logs.append(decoded_log)
+        decoded_logs.sort(key=lambda log: log.logIndex)
+        return decoded_logs
+
+    def has_event(self, names, abi=None):
+        return len(self.events(names, abi)) > 0
+
+    def logs_matching(self, decoders):
+        """Logs matching the (address, topic0) keys of decoders, decoded with the mapped event abi.
+
+        A None address matches any address. Returned in receipt order.
+        """
+        decoded_logs = []
+        for position, log in enumerate(self.receipt.logs):
+            # Ignore anonymous events (logs without topics).
+            if len(log.topics) == 0:
+                continue
+            topic = log.topics[0].hex()
+            event_abi = decoders.get((log.address.lower(), topic)) or decoders.get((None, topic))
+            if event_abi is None:
+                continue
+            decoded_log = self._decode(position, event_abi)
+            if decoded_log is not None:
+                decoded_logs.append(decoded_log)
+        return decoded_logs
+
+    def _decode(self, position, event_abi):
+        key = (position, id(event_abi))
+        with self._lock:
+            if key in self._decoded:
+                return self._decoded[key]
+        decoded_log = DecodedLog.from_log(self._codec, event_abi, self.receipt.logs[position], self.receipt)
+        if decoded_log is not None:
+            try:
+                decoded_log.args
+            except (MismatchedABI, LogTopicError, InvalidEventABI, TypeError, DecodingError) as e:
+                logging.debug(f"Discarding log {position} of {event_abi['name']} that failed to decode.\n{e}")
+                decoded_log = None
+        with self._lock:
+            return self._decoded.setdefault(key, decoded_log)
+
+_decoded_receipts = OrderedDict()
+_decoded_receipts_lock = threading.Lock()
+def get_decoded_receipt(receipt):
+    """Get the DecodedReceipt shared by all helpers processing the txn, memoized by txn hash."""
+    if receipt.get("transactionHash") is None:
+        return DecodedReceipt(receipt)
+    txn_hash = receipt.transactionHash.hex()
+    with _decoded_receipts_lock:
+        decoded_receipt = _decoded_receipts.get(txn_hash)
+        # A reorg can include the txn in another block, with different logs.
+        if decoded_receipt is not None and decoded_receipt.receipt.get("blockHash") == receipt.get("blockHash"):
+            _decoded_receipts.move_to_end(txn_hash)
+            return decoded_receipt
+        decoded_receipt = DecodedReceipt(receipt)
+        _decoded_receipts[txn_hash] = decoded_receipt
+        if len(_decoded_receipts) > RECEIPT_CACHE_SIZE:
+            _decoded_receipts.popitem(last=False)
+        return decoded_receipt
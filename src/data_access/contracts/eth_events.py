@@ -1,15 +1,19 @@
-import asyncio
 import os
+import sqlite3
+import threading
 from collections import OrderedDict
 from enum import IntEnum
 
 from constants.spectra import SPECTRA_SPINTO_POOLS
+from data_access.block_cursor_store import cursor_namespace, get_block_cursor_store
+from data_access.contracts.decoded_receipt import get_decoded_receipt
+from data_access.contracts.log_backfill import backfill_logs, get_logs_with_retry
+from data_access.contracts.log_poller import get_log_poller
 from data_access.contracts.tractor_events import TractorEvents
-from tools.util import get_txn_receipt
+from tools.util import get_txn_receipt, get_txn_receipts
+from eth_utils import event_abi_to_log_topic
+from hexbytes import HexBytes
 from web3 import Web3
-from web3 import exceptions as web3_exceptions
-from web3.logs import DISCARD
-from web3.datastructures import AttributeDict
 
 from data_access.contracts.util import *
 
@@ -291,97 +295,141 @@ class TxnPair:
         self.txn_hash = txn_hash
         self.logs = logs
 
-class EthEventsClient:
+class BlockCursor:
+    """Progress of an event client: all logs up to block, and the given txns of later blocks, have been returned."""
+
+    def __init__(self, block, processed_txns):
+        self.block = block
+        # Txn hash (hex str) to block number.
+        self.processed_txns = processed_txns
+
+class ReceiptDecoder:
+    """Decodes the logs of interest of a set of client types from txn receipts.
+
+    Pure and RPC free, so it is safe to use on alert hot paths. Get shared instances with get_receipt_decoder().
+    """
+
     def __init__(self, client_types, addresses=[]):
         if not client_types:
             raise ValueError("Mut specify at least one client type")
-
-        # Track recently seen txns to avoid processing same txn multiple times.
-        self._recent_processed_txns = OrderedDict()
-        self._web3 = get_web3_instance()
-        self._client_types = client_types
-
-        self._contracts = []
-        self._contract_addresses = []
-        self._signature_list = []
-        self._events_dict = {}
+        self.client_types = client_types
+        self.contract_addresses = []
+        self.signature_list = []
+        self.events_dict = {}
+        contracts = []
 
         for client_type in client_types:
             if client_type == EventClientType.AQUIFER:
-                self._contracts.append(get_aquifer_contract())
-                self._contract_addresses.append(AQUIFER_ADDR)
-                self._signature_list.extend(AQUIFER_SIGNATURES_LIST)
-                self._events_dict.update(AQUIFER_EVENT_MAP)
+                contracts.append(get_aquifer_contract())
+                self.contract_addresses.append(AQUIFER_ADDR)
+                self.signature_list.extend(AQUIFER_SIGNATURES_LIST)
+                self.events_dict.update(AQUIFER_EVENT_MAP)
             elif client_type == EventClientType.WELL:
-                self._contracts.append(get_well_contract(None))
-                self._contract_addresses.extend(addresses)
-                self._signature_list.extend(WELL_SIGNATURES_LIST)
-                self._events_dict.update(WELL_EVENT_MAP)
+                contracts.append(get_well_contract(None))
+                self.contract_addresses.extend(addresses)
+                self.signature_list.extend(WELL_SIGNATURES_LIST)
+                self.events_dict.update(WELL_EVENT_MAP)
             elif client_type == EventClientType.BEANSTALK:
-                self._contracts.append(get_beanstalk_contract())
-                self._contract_addresses.append(BEANSTALK_ADDR)
-                self._signature_list.extend(BEANSTALK_SIGNATURES_LIST)
-                self._events_dict.update(BEANSTALK_EVENT_MAP)
+                contracts.append(get_beanstalk_contract())
+                self.contract_addresses.append(BEANSTALK_ADDR)
+                self.signature_list.extend(BEANSTALK_SIGNATURES_LIST)
+                self.events_dict.update(BEANSTALK_EVENT_MAP)
             elif client_type == EventClientType.SEASON:
-                self._contracts.append(get_beanstalk_contract())
-                self._contract_addresses.append(BEANSTALK_ADDR)
-                self._signature_list.extend(SEASON_SIGNATURES_LIST)
-                self._events_dict.update(SEASON_EVENT_MAP)
+                contracts.append(get_beanstalk_contract())
+                self.contract_addresses.append(BEANSTALK_ADDR)
+                self.signature_list.extend(SEASON_SIGNATURES_LIST)
+                self.events_dict.update(SEASON_EVENT_MAP)
             elif client_type == EventClientType.MARKET:
-                self._contracts.append(get_beanstalk_contract())
-                self._contract_addresses.append(BEANSTALK_ADDR)
-                self._signature_list.extend(MARKET_SIGNATURES_LIST)
-                self._events_dict.update(MARKET_EVENT_MAP)
+                contracts.append(get_beanstalk_contract())
+                self.contract_addresses.append(BEANSTALK_ADDR)
+                self.signature_list.extend(MARKET_SIGNATURES_LIST)
+                self.events_dict.update(MARKET_EVENT_MAP)
             elif client_type == EventClientType.BARN_RAISE:
-                self._contracts.append(get_fertilizer_contract())
-                self._contracts.append(get_beanstalk_contract())
-                self._contract_addresses.extend([FERTILIZER_ADDR, BEANSTALK_ADDR])
-                self._signature_list.extend(FERTILIZER_SIGNATURES_LIST)
-                self._events_dict.update(FERTILIZER_EVENT_MAP)
+                contracts.append(get_fertilizer_contract())
+                contracts.append(get_beanstalk_contract())
+                self.contract_addresses.extend([FERTILIZER_ADDR, BEANSTALK_ADDR])
+                self.signature_list.extend(FERTILIZER_SIGNATURES_LIST)
+                self.events_dict.update(FERTILIZER_EVENT_MAP)
             elif client_type == EventClientType.CONTRACT_MIGRATED:
-                self._contracts.append(get_beanstalk_contract())
-                self._contract_addresses.append(BEANSTALK_ADDR)
-                self._signature_list.extend(CONTRACTS_MIGRATED_SIGNATURES_LIST)
-                self._events_dict.update(CONTRACTS_MIGRATED_EVENT_MAP)
+                contracts.append(get_beanstalk_contract())
+                self.contract_addresses.append(BEANSTALK_ADDR)
+                self.signature_list.extend(CONTRACTS_MIGRATED_SIGNATURES_LIST)
+                self.events_dict.update(CONTRACTS_MIGRATED_EVENT_MAP)
             elif client_type == EventClientType.INTEGRATIONS:
-                self._contracts.append(get_wrapped_silo_contract(SPINTO_ADDR))
-                self._contracts.extend(get_curve_spectra_contract(s.pool, s.is_legacy_abi) for s in SPECTRA_SPINTO_POOLS)
-                self._contract_addresses.append(SPINTO_ADDR)
-                self._contract_addresses.extend(s.pool for s in SPECTRA_SPINTO_POOLS)
-                self._signature_list.extend(INTEGRATIONS_SIGNATURES_LIST)
-                self._events_dict.update(INTEGRATIONS_EVENT_MAP)
-        self._set_filters()
-
-    def _set_filters(self):
-        """This is located in a method so it can be reset on the fly."""
-        self._event_filters = []
-        for address in self._contract_addresses:
-            self._event_filters.append(
-                safe_create_filter(
-                    self._web3,
-                    address=address,
-                    topics=[self._signature_list],
-                    from_block=os.environ.get("DRY_RUN_FROM_BLOCK", "latest"),
-                    to_block=os.environ.get("DRY_RUN_TO_BLOCK", "latest"),
-                )
-            )
+                contracts.append(get_wrapped_silo_contract(SPINTO_ADDR))
+                contracts.extend(get_curve_spectra_contract(s.pool, s.is_legacy_abi) for s in SPECTRA_SPINTO_POOLS)
+                self.contract_addresses.append(SPINTO_ADDR)
+                self.contract_addresses.extend(s.pool for s in SPECTRA_SPINTO_POOLS)
+                self.signature_list.extend(INTEGRATIONS_SIGNATURES_LIST)
+                self.events_dict.update(INTEGRATIONS_EVENT_MAP)
+        self._decoders = self._build_decoders(contracts)
+
+    def _build_decoders(self, contracts):
+        """Map each (None, topic0) of interest to the ABI of the event it identifies.
+
+        Like web3's processReceipt, logs are matched by topic0 from any emitting address, so the key has no address.
+        When several contracts define the same topic0, the first one listed wins.
+        """
+        decoders = {}
+        event_names = set(self.events_dict[signature] for signature in self.signature_list)
+        for contract in contracts:
+            for abi in contract.abi:
+                if abi.get("type") == "event" and abi["name"] in event_names:
+                    decoders.setdefault((None, "0x" + event_abi_to_log_topic(abi).hex()), abi)
+        return decoders
+
+    def logs_from_receipt(self, receipt):
+        """Return all logs of interest from the given receipt. Args are decoded lazily on first access.
+
+        Decoded logs are shared with every other helper processing the same txn.
+        """
+        return get_decoded_receipt(receipt).logs_matching(self._decoders)
+
+_receipt_decoders = {}
+_receipt_decoders_lock = threading.Lock()
+def get_receipt_decoder(client_types, addresses=[]):
+    """Get the shared ReceiptDecoder of the client types and addresses, built on first use."""
+    key = (tuple(client_types), tuple(addr.lower() for addr in addresses))
+    with _receipt_decoders_lock:
+        if key not in _receipt_decoders:
+            _receipt_decoders[key] = ReceiptDecoder(client_types, addresses)
+        return _receipt_decoders[key]
+
+class EthEventsClient:
+    def __init__(self, client_types, addresses=[]):
+        # Track recently seen txns to avoid processing same txn multiple times.
+        self._recent_processed_txns = OrderedDict()
+        self._web3 = get_web3_instance()
+        self._client_types = client_types
+        self._receipt_decoder = get_receipt_decoder(client_types, addresses)
+        self._contract_addresses = self._receipt_decoder.contract_addresses
+        self._signature_list = self._receipt_decoder.signature_list
+        self._events_dict = self._receipt_decoder.events_dict
+        # Subscription to the shared log poller, created on first use so that clients only used for
+        # receipt decoding do not receive entries.
+        self._subscription = None
+        # Persisted block cursor, keyed in construction order. Key is None if the cursor is not persisted.
+        self._cursor_key = block_cursor_key(client_types, self._contract_addresses)
+        self._committed_cursor = None
+        # Block up to which all entries have been returned, committed once the caller asks for more. Only the poller's
+        # synced block counts, the stream is best effort. Txns returned from later blocks are committed along with it.
+        self._pending_block = None
+        self._pending_txns = {}
+        # Serializes cursor updates, commits can come from pipeline threads while the monitor thread polls.
+        self._cursor_lock = threading.Lock()
+        # Missed (from_block, to_block) range to catch up on before going live.
+        self._catch_up_range = None
 
     def get_log_range(self, from_block, to_block="latest"):
-        filters = []
-        for address in self._contract_addresses:
-            filters.append(
-                safe_create_filter(
-                    self._web3,
-                    address=address,
-                    topics=[self._signature_list],
-                    from_block=from_block,
-                    to_block=to_block,
-                )
-            )
-        return self.get_new_logs(filters=filters, get_all=True)
+        """Return the decoded txns of all entries within the block range, in chain order.
 
-    def get_new_logs(self, dry_run=None, filters=None, get_all=False):
-        """Iterate through all entries passing filter and return list of decoded Log Objects.
+        Large ranges are fetched concurrently in adaptively sized chunks.
+        """
+        entries = backfill_logs(self._contract_addresses, [self._signature_list], from_block, to_block)
+        return self._txn_pairs_from_entries(entries)
+
+    def get_new_logs(self, dry_run=None, commit=True):
+        """Iterate through all new entries and return list of decoded Log Objects.
 
         Each on-chain event triggered creates one log, which is associated with one entry. We
         assume that an entry here will contain only one log of interest. It is
@@ -390,44 +438,142 @@ class EthEventsClient:
 
         Note that there may be multiple unique entries with the same topic. Though we assume
         each entry indicates one log of interest.
-        """
-        self_filters = filters is None
-        if self_filters:
-            filters = self._event_filters
-        # All decoded logs of interest from each txn.
-        txn_hash_set = set()
-        txn_logs_list = []
 
+        By default the logs returned by the previous call are considered processed. Callers that process logs
+        asynchronously pass commit=False and call commit_block_cursor(pending_cursor) once they are done.
+        """
         if not dry_run:
-            new_entries = []
-            # Loop filters to accommodate reset in case of errors
-            for i in range(len(filters)):
-                try_count = 0
-                while try_count < 3:
-                    try_count += 1
-                    try:
-                        new_entries.extend(self.safe_get_new_entries(filters[i], get_all=get_all))
-                        break
-                    except (
-                        ValueError,
-                        asyncio.TimeoutError,
-                        websockets.exceptions.ConnectionClosedError,
-                        Exception,
-                    ) as e:
-                        logging.warning(e, exc_info=True)
-                        logging.warning(
-                            f"[{self_filters}] filter.safe_get_new_entries() failed or timed out. Retrying..."
-                        )
-                        time.sleep(1)
-                        # Establish new filters and re-loop
-                        self._set_filters()
-                        filters = self._event_filters
+            if self._subscription is None and self._contract_addresses:
+                self._subscription = get_log_poller().subscribe(self._contract_addresses, self._signature_list)
+                self._load_block_cursor()
+            # Everything returned by the previous call has been processed once the caller asks for more.
+            if commit:
+                self.commit_block_cursor(self.pending_cursor)
+            catch_up_txn_pairs = self._catch_up()
+            # Polling for new entries is driven by the block clock, draining the subscription costs no RPC calls.
+            new_entries = self.safe_get_new_entries()
+            return catch_up_txn_pairs + self._txn_pairs_from_entries(new_entries)
         else:
             new_entries = get_test_entries(dry_run)
             time.sleep(3)
+            return self._txn_pairs_from_entries(new_entries)
+
+    def wait_for_new_logs(self, timeout):
+        """Block until new entries have been delivered to this client, or the timeout (in seconds) elapses.
+
+        Returns immediately if this client has not subscribed to the log poller yet (first call to get_new_logs).
+        """
+        if self._subscription is None:
+            return False
+        return get_log_poller().wait(self._subscription, timeout)
+
+    def _load_block_cursor(self):
+        """Find the blocks missed since this client last ran, bounded by BLOCK_CURSOR_MAX_CATCHUP."""
+        store = get_block_cursor_store()
+        if store is None or "DRY_RUN_FROM_BLOCK" in os.environ:
+            self._cursor_key = None
+            return
+        last_block = store.get(self._cursor_key)
+        if last_block is None:
+            return
+        processed_txns = store.processed_txns(self._cursor_key)
+        self._committed_cursor = BlockCursor(last_block, processed_txns)
+        for txn_hash in processed_txns:
+            self._remember_processed_txn(HexBytes(txn_hash))
+        start_block = self._subscription.start_block
+        from_block = max(last_block + 1, start_block - BLOCK_CURSOR_MAX_CATCHUP)
+        if from_block > last_block + 1:
+            logging.warning(
+                f"{self._cursor_key} is {start_block - last_block - 1} blocks behind, "
+                f"skipping blocks {last_block + 1} to {from_block - 1}"
+            )
+        if from_block < start_block:
+            self._catch_up_range = (from_block, start_block - 1)
+
+    def _catch_up(self):
+        """Return the txns of the missed block range, if any. The range is retried until it succeeds."""
+        if self._catch_up_range is None:
+            return []
+        from_block, to_block = self._catch_up_range
+        logging.info(f"{self._cursor_key} catching up on blocks {from_block} to {to_block}")
+        # Txns processed before the restart were persisted with the cursor, they are not returned again.
+        txn_pairs = [
+            txn_pair for txn_pair in self.get_log_range(from_block, to_block)
+            if txn_pair.txn_hash not in self._recent_processed_txns
+        ]
+        for txn_pair in txn_pairs:
+            self._remember_processed_txn(txn_pair.txn_hash)
+        self._catch_up_range = None
+        self._advance_pending_block(to_block)
+        return txn_pairs
+
+    @property
+    def pending_cursor(self):
+        """BlockCursor of the logs returned by get_new_logs so far, or None before any were returned."""
+        with self._cursor_lock:
+            if self._pending_block is None:
+                return None
+            return BlockCursor(self._pending_block, dict(self._pending_txns))
+
+    def _advance_pending_block(self, block, returned_entries=[]):
+        with self._cursor_lock:
+            if block is not None and (self._pending_block is None or block > self._pending_block):
+                self._pending_block = block
+                self._pending_txns = {txn: txn_block for txn, txn_block in self._pending_txns.items() if txn_block > block}
+            for entry in returned_entries:
+                if self._pending_block is None or entry["blockNumber"] > self._pending_block:
+                    self._pending_txns[HexBytes(entry["transactionHash"]).hex()] = entry["blockNumber"]
+
+    def commit_block_cursor(self, cursor):
+        """Persist that all logs of the BlockCursor have been processed. Commits older than the last one are ignored."""
+        with self._cursor_lock:
+            if cursor is None:
+                return
+            # Later cursors of the same block only add txns, so the number of txns orders them.
+            committed = self._committed_cursor
+            if committed is not None and (cursor.block, len(cursor.processed_txns)) <= (committed.block, len(committed.processed_txns)):
+                return
+            try:
+                if self._cursor_key is not None:
+                    get_block_cursor_store().set(self._cursor_key, cursor.block, cursor.processed_txns)
+                self._committed_cursor = cursor
+            except sqlite3.Error as e:
+                logging.warning(f"Failed to persist block cursor of {self._cursor_key}\n{e}")
+
+    def replay_uncommitted(self):
+        """Return the txns of all blocks past the committed cursor again from the next get_new_logs.
+
+        Used after a txn failed to process, since no cursor was committed past it.
+        """
+        with self._cursor_lock:
+            if self._pending_block is None:
+                return
+            committed = self._committed_cursor or BlockCursor(self._subscription.start_block - 1, {})
+            to_block = max([self._pending_block] + list(self._pending_txns.values()))
+            if to_block <= committed.block:
+                return
+            logging.warning(f"{self._cursor_key} replaying uncommitted blocks {committed.block + 1} to {to_block}")
+            self._catch_up_range = (committed.block + 1, to_block)
+            self._pending_block = committed.block
+            self._pending_txns = dict(committed.processed_txns)
+        self._recent_processed_txns = OrderedDict((HexBytes(txn_hash), True) for txn_hash in committed.processed_txns)
+
+    def _remember_processed_txn(self, txn_hash):
+        # Arbitrary value. Using this as a set.
+        self._recent_processed_txns[txn_hash] = True
+        # Keep the recent txn queue size within limit.
+        for _ in range(max(0, len(self._recent_processed_txns) - TXN_MEMORY_SIZE_LIMIT)):
+            self._recent_processed_txns.popitem(last=False)
+
+    def _txn_pairs_from_entries(self, entries):
+        """Retrieve and decode the receipt of each unique txn in entries, ordered by block."""
+        # All decoded logs of interest from each txn.
+        txn_hash_set = set()
+        txn_hashes = []
+        txn_logs_list = []
 
         # Track which unique logs have already been processed from this event batch.
-        for entry in new_entries:
+        for entry in entries:
             # There can be zero topics for dry run
             if len(entry.get("topics", [])) > 0:
                 topic_hash = entry["topics"][0].hex()
@@ -443,17 +589,27 @@ class EthEventsClient:
             txn_hash = entry["transactionHash"]
             if txn_hash in txn_hash_set:
                 continue
+            txn_hash_set.add(txn_hash)
+            txn_hashes.append(txn_hash)
+
+        if not txn_hashes:
+            return txn_logs_list
+
+        # Retrieve all txn receipts together, a single request if they are all in the same block.
+        block_numbers = set(entry.get("blockNumber") for entry in entries)
+        block_number = block_numbers.pop() if len(block_numbers) == 1 else None
+        block_hashes = {HexBytes(entry["transactionHash"]).hex(): entry.get("blockHash") for entry in entries}
+        receipts = get_txn_receipts(self._web3, txn_hashes, block_number=block_number, block_hashes=block_hashes)
 
-            # Retrieve the full txn and txn receipt.
-            receipt = get_txn_receipt(self._web3, txn_hash)
+        for txn_hash in txn_hashes:
+            receipt = receipts[HexBytes(txn_hash).hex()]
             decoded_logs = self.logs_from_receipt(receipt)
 
             # Add all remaining txn logs to log map.
-            txn_hash_set.add(txn_hash)
             tractor_separated = TractorEvents(receipt, decoded_logs)
             # If tractor logs are present, this inserts multiple entries for each tractor bound.
             for logs in tractor_separated.all_separated_events():
-                logs.sort(key=lambda log: getattr(log, "logIndex", float('inf')))
+                logs.sort(key=lambda log: log.logIndex)
                 txn_logs_list.append(TxnPair(txn_hash, logs))
 
         txn_logs_list.sort(
@@ -461,88 +617,57 @@ class EthEventsClient:
         )
         return txn_logs_list
 
-    def safe_get_new_entries(self, filter, get_all=False):
-        """Retrieve all new entries that pass the filter.
+    def safe_get_new_entries(self):
+        """Retrieve all new entries delivered to this client by the shared log poller.
 
-        Returns one entry for every log that matches a filter. So if a single txn has multiple logs
+        Returns one entry for every log of interest. So if a single txn has multiple logs
         of interest this will return multiple entries.
-        Catch any exceptions that may arise when attempting to connect to Infura.
         """
-
-        if get_all or "DRY_RUN_FROM_BLOCK" in os.environ:
-            return filter.get_all_entries()
-        # We must verify new_entries because get_new_entries() will occasionally pull
-        # entries that are not actually new. May be a bug with web3 or may just be a relic
-        # of the way block confirmations work.
-        new_entries = filter.get_new_entries()
+        if self._subscription is None:
+            return []
+        new_entries, synced_block = self._subscription.drain()
         new_unique_entries = []
-        # Remove entries w txn hashes that already processed on past get_new_entries calls.
+        # Remove entries w txn hashes that already processed on past calls.
         for i in range(len(new_entries)):
             entry = new_entries[i]
             # If we have not already processed this txn hash.
             if entry.transactionHash not in self._recent_processed_txns:
                 new_unique_entries.append(entry)
-            else:
-                pass
-                # logging.warning(
-                #     f"Ignoring txn that has already been processed ({entry.transactionHash})"
-                # )
         # Add all new txn hashes to recent processed set/dict.
         for entry in new_unique_entries:
-            # Arbitrary value. Using this as a set.
-            self._recent_processed_txns[entry.transactionHash] = True
-        # Keep the recent txn queue size within limit.
-        for _ in range(max(0, len(self._recent_processed_txns) - TXN_MEMORY_SIZE_LIMIT)):
-            self._recent_processed_txns.popitem(last=False)
+            self._remember_processed_txn(entry.transactionHash)
+        # Txns streamed ahead of the synced block are committed by hash, so that a restart neither misses nor replays them.
+        self._advance_pending_block(synced_block, new_unique_entries)
         return new_unique_entries
-        # return filter.get_all_entries() # Use this to search for old events.
 
     def logs_from_receipt(self, receipt):
-        """Decode and return all logs of interest from the given receipt"""
-        decoded_logs = []
-        for signature in self._signature_list:
-            for contract in self._contracts:
-                try:
-                    decoded_type_logs = contract.events[
-                        self._events_dict[signature]
-                    ]().processReceipt(receipt, errors=DISCARD)
-                except web3_exceptions.ABIEventFunctionNotFound:
-                    continue
-                for log in decoded_type_logs:
-                    # Attach the full receipt
-                    updated_log = AttributeDict({**dict(log), "receipt": receipt})
-                    decoded_logs.append(updated_log)
-        return decoded_logs
-
-def safe_create_filter(web3, address, topics, from_block, to_block):
-    """Create a filter but handle connection exceptions that web3 cannot manage."""
-    max_tries = 15
-    try_count = 0
-    while try_count < max_tries:
-        try:
-            filter_params = {
-                "topics": topics,
-                "fromBlock": from_block,
-                "toBlock": to_block
-            }
-            # Include the address in the filter params only if it is not None
-            if address:
-                filter_params["address"] = address
-            return web3.eth.filter(filter_params)
-        except websockets.exceptions.ConnectionClosedError as e:
-            logging.warning(e, exc_info=True)
-            time.sleep(2)
-            try_count += 1
-    raise Exception("Failed to safely create filter")
+        """Return all logs of interest from the given receipt. Args are decoded lazily on first access."""
+        return self._receipt_decoder.logs_from_receipt(receipt)
+
+_block_cursor_key_counts = {}
+_block_cursor_key_lock = threading.Lock()
+def block_cursor_key(client_types, addresses):
+    """Persisted cursor key of an event client, stable across restarts of the same bot.
+
+    Called when the client is constructed. Identical clients within a process are numbered in construction order,
+    which is fixed by the setup of the bot rather than by which monitor thread polls first.
+    """
+    key = (
+        f"{cursor_namespace()}:{','.join(ct.name for ct in client_types)}:"
+        f"{','.join(sorted(set(addr.lower() for addr in addresses)))}"
+    )
+    with _block_cursor_key_lock:
+        count = _block_cursor_key_counts.get(key, 0)
+        _block_cursor_key_counts[key] = count + 1
+    return key if count == 0 else f"{key}#{count}"
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    filter = safe_create_filter(
+    entries = get_logs_with_retry(
         get_web3_instance(),
-        address=BEANSTALK_ADDR,
+        addresses=[BEANSTALK_ADDR],
         topics=[BEANSTALK_SIGNATURES_LIST],
-        from_block="0x2299ae2",
-        to_block="0x2299ecf",
+        from_block=0x2299ae2,
+        to_block=0x2299ecf,
     )
-    entries = filter.get_new_entries()
     logging.info(f"found {len(entries)} entries")
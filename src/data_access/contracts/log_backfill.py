@@ -0,0 +1,96 @@
+import logging
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import websockets
+
+from data_access.contracts.util import *
+from data_access.rpc_health import is_log_range_error
+
+def get_logs_with_retry(web3, addresses, topics, from_block, to_block):
+    """Query logs with eth_getLogs but handle connection exceptions that web3 cannot manage."""
+    max_tries = 15
+    try_count = 0
+    while try_count < max_tries:
+        try:
+            filter_params = {
+                "topics": topics,
+                "fromBlock": from_block,
+                "toBlock": to_block
+            }
+            # Include the addresses in the filter params only if there are any
+            if addresses:
+                filter_params["address"] = addresses
+            return web3.eth.get_logs(filter_params)
+        except websockets.exceptions.ConnectionClosedError as e:
+            logging.warning(e, exc_info=True)
+            try_count += 1
+            rpc_backoff(web3, try_count)
+    raise Exception("Failed to safely get logs")
+
+def backfill_logs(addresses, topics, from_block, to_block):
+    """Return all entries within the block range, in chain order.
+
+    The range is split into chunks that are queried concurrently on the archive endpoint by up to
+    LOG_BACKFILL_WORKERS threads. Chunk sizes adapt so that each query returns about
+    LOG_BACKFILL_TARGET_RESULTS entries, and chunks rejected by the provider for being too large are bisected.
+    """
+    if to_block == "latest":
+        to_block = get_archive_web3_instance().eth.block_number
+    if to_block - from_block < LOG_BACKFILL_INITIAL_BLOCK_RANGE:
+        # Small ranges (e.g. a single block) do not need the worker pool.
+        return _sorted_entries(_get_logs_bisecting(addresses, topics, from_block, to_block))
+
+    block_range = LOG_BACKFILL_INITIAL_BLOCK_RANGE
+    next_block = from_block
+    # Chunks split after a range error, queried before any new chunk.
+    split_chunks = deque()
+    pending = {}
+    entries = []
+    with ThreadPoolExecutor(max_workers=LOG_BACKFILL_WORKERS) as executor:
+        while next_block <= to_block or split_chunks or pending:
+            while len(pending) < LOG_BACKFILL_WORKERS and (split_chunks or next_block <= to_block):
+                if split_chunks:
+                    chunk = split_chunks.popleft()
+                else:
+                    chunk = (next_block, min(to_block, next_block + block_range - 1))
+                    next_block = chunk[1] + 1
+                pending[executor.submit(_get_logs, addresses, topics, *chunk)] = chunk
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk_from_block, chunk_to_block = pending.pop(future)
+                chunk_size = chunk_to_block - chunk_from_block + 1
+                try:
+                    chunk_entries = future.result()
+                except Exception as e:
+                    if not is_log_range_error(e) or chunk_size == 1:
+                        raise
+                    middle = chunk_from_block + chunk_size // 2
+                    split_chunks.extend([(chunk_from_block, middle - 1), (middle, chunk_to_block)])
+                    block_range = max(1, min(block_range, chunk_size // 2))
+                    logging.info(f"Splitting log query of blocks {chunk_from_block} to {chunk_to_block}: {e}")
+                    continue
+                entries.extend(chunk_entries)
+                # Aim for the target number of results, growing by at most 2x per chunk.
+                target_range = chunk_size * LOG_BACKFILL_TARGET_RESULTS // max(1, len(chunk_entries))
+                block_range = max(1, min(LOG_BACKFILL_MAX_BLOCK_RANGE, 2 * block_range, target_range))
+    logging.info(f"Backfilled {len(entries)} entries from blocks {from_block} to {to_block}")
+    return _sorted_entries(entries)
+
+def _get_logs(addresses, topics, from_block, to_block):
+    return get_logs_with_retry(get_archive_web3_instance(), addresses, topics, from_block, to_block)
+
+def _get_logs_bisecting(addresses, topics, from_block, to_block):
+    try:
+        return _get_logs(addresses, topics, from_block, to_block)
+    except Exception as e:
+        if not is_log_range_error(e) or from_block == to_block:
+            raise
+        middle = (from_block + to_block + 1) // 2
+        return (
+            _get_logs_bisecting(addresses, topics, from_block, middle - 1)
+            + _get_logs_bisecting(addresses, topics, middle, to_block)
+        )
+
+def _sorted_entries(entries):
+    return sorted(entries, key=lambda entry: (entry["blockNumber"], entry["logIndex"]))
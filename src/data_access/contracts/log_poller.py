@@ -0,0 +1,247 @@
+import logging
+import os
+import threading
+import time
+
+from web3 import Web3
+
+from data_access.contracts.block_clock import get_block_clock
+from data_access.contracts.log_stream import LogStream
+from data_access.contracts.util import *
+
+class LogSubscription:
+    """Buffer of log entries matching a set of (address, topic0) pairs.
+
+    Args:
+        start_block: first block whose logs will be delivered to this subscription.
+    """
+
+    def __init__(self, addresses, topics, start_block):
+        self.addresses = set(addr.lower() for addr in addresses)
+        self.topics = set(topics)
+        self.start_block = start_block
+        self._entries = []
+        # Last block for which all matching entries have been pushed.
+        self._synced_block = start_block - 1
+        # (blockHash, logIndex) of entries already pushed by the stream, mapped to their block number.
+        self._streamed = {}
+        # Last block whose entries the connected stream should have pushed, best effort unlike the synced block.
+        self.stream_block = start_block - 1
+        self._lock = threading.Lock()
+
+    def matches(self, entry):
+        if len(entry.get("topics", [])) == 0 or entry["topics"][0].hex() not in self.topics:
+            return False
+        return entry["address"].lower() in self.addresses
+
+    def push(self, entries, synced_block=None):
+        """Add polled entries complete up to synced_block, skipping those the stream already pushed."""
+        with self._lock:
+            self._entries.extend(
+                entry for entry in entries if (entry["blockHash"], entry["logIndex"]) not in self._streamed
+            )
+            if synced_block is not None:
+                self._synced_block = synced_block
+                self._streamed = {key: block for key, block in self._streamed.items() if block > synced_block}
+
+    def push_streamed(self, entries):
+        """Add entries received from the stream ahead of the synced block, skipping duplicates."""
+        with self._lock:
+            for entry in entries:
+                key = (entry["blockHash"], entry["logIndex"])
+                if key in self._streamed:
+                    continue
+                self._streamed[key] = entry["blockNumber"]
+                self._entries.append(entry)
+
+    def has_entries(self):
+        with self._lock:
+            return len(self._entries) > 0
+
+    def drain(self):
+        """Return and clear all entries received since the last drain.
+
+        Also returns the block up to which the returned entries are complete.
+        """
+        with self._lock:
+            entries = self._entries
+            self._entries = []
+            return entries, self._synced_block
+
+class LogPoller:
+    """Process-wide block cursor shared by all EthEventsClients.
+
+    Polls are driven by the shared BlockClock, so nothing is queried until a new block exists. They run on the
+    poller's own thread so that a slow range does not delay the clock's other listeners. Each poll issues a single
+    eth_getLogs over the new block range covering every subscribed address and topic, and fans the resulting
+    entries out to the matching subscriptions.
+
+    In the "stream" LOG_INGESTION_MODE, a LogStream also pushes entries ahead of the cursor as soon as
+    they are emitted. Polling then only backfills what the stream missed, less frequently while it is connected.
+    """
+
+    def __init__(self):
+        # Serializes polls.
+        self._lock = threading.Lock()
+        # Guards subscriptions, cursor and streamed entries. Held only briefly so streamed entries are not
+        # delayed by a poll in progress.
+        self._fanout_lock = threading.Lock()
+        self._new_entries = threading.Condition(self._fanout_lock)
+        self._subscriptions = []
+        # Last block for which logs have been delivered to subscribers.
+        self._cursor = None
+        self._to_block = None
+        if "DRY_RUN_TO_BLOCK" in os.environ:
+            self._to_block = int(os.environ["DRY_RUN_TO_BLOCK"], 0)
+        self._last_poll_time = 0
+        # Incremented whenever the union of subscribed addresses and topics changes.
+        self.filter_version = 0
+        self._stream = None
+        # Latest head announced by the BlockClock, polled by the poller thread.
+        self._head = None
+        self._new_block = threading.Event()
+        self._thread = threading.Thread(target=self._poll_loop, name="log-poller", daemon=True)
+
+    def subscribe(self, addresses, topics):
+        """Register interest in the given topics emitted by any of the given addresses.
+
+        Only logs from blocks after the current cursor will be delivered.
+        """
+        with self._lock:
+            if self._cursor is None:
+                if "DRY_RUN_FROM_BLOCK" in os.environ:
+                    self._cursor = int(os.environ["DRY_RUN_FROM_BLOCK"], 0) - 1
+                else:
+                    self._cursor = get_web3_instance().eth.block_number
+            with self._fanout_lock:
+                subscription = LogSubscription(addresses, topics, self._cursor + 1)
+                self._subscriptions.append(subscription)
+                self.filter_version += 1
+            if len(self._subscriptions) == 1:
+                self._thread.start()
+                get_block_clock().add_listener(self._on_new_block)
+            if self._stream is None and LOG_INGESTION_MODE == "stream" and "DRY_RUN_FROM_BLOCK" not in os.environ:
+                self._stream = LogStream(self)
+                self._stream.start()
+        return subscription
+
+    def subscribed_filter(self):
+        """Current filter version and the union of subscribed addresses and topics."""
+        with self._fanout_lock:
+            addresses = set()
+            topics = set()
+            for subscription in self._subscriptions:
+                addresses.update(subscription.addresses)
+                topics.update(subscription.topics)
+            return self.filter_version, addresses, topics
+
+    def stream_status_str(self):
+        return self._stream.status_str() if self._stream else "disabled"
+
+    def request_poll(self):
+        """Let the next poll run immediately, regardless of LOG_POLL_MIN_INTERVAL."""
+        self._last_poll_time = 0
+
+    def _on_new_block(self, block_number):
+        # Runs on the clock thread, the poll itself happens on the poller thread.
+        self._head = block_number
+        self._new_block.set()
+        if self._stream and self._stream.connected:
+            # Logs of the previous block have been streamed by the time a new head is seen.
+            with self._new_entries:
+                for subscription in self._subscriptions:
+                    subscription.stream_block = max(subscription.stream_block, block_number - 1)
+                self._new_entries.notify_all()
+
+    def _poll_loop(self):
+        while True:
+            self._new_block.wait()
+            self._new_block.clear()
+            head = self._head
+            try:
+                self.poll(head=head)
+            except Exception as e:
+                logging.warning(f"LogPoller failed to poll up to block {head}.\n{e}", exc_info=True)
+
+    def poll(self, head=None):
+        """Fetch logs for all blocks past the cursor, up to head, and distribute them to subscribers.
+
+        Safe to call from any thread. Calls within LOG_POLL_MIN_INTERVAL of the previous poll
+        (LOG_STREAM_POLL_INTERVAL while the stream is connected) return immediately. Failed ranges are
+        retried on the next poll.
+        """
+        with self._lock:
+            min_interval = LOG_STREAM_POLL_INTERVAL if self._stream and self._stream.connected else LOG_POLL_MIN_INTERVAL
+            if time.time() < self._last_poll_time + min_interval:
+                return
+            self._last_poll_time = time.time()
+
+            web3 = get_web3_instance()
+            if head is None:
+                head = web3.eth.block_number
+            if self._to_block is not None:
+                head = min(head, self._to_block)
+            while self._cursor < head:
+                from_block = self._cursor + 1
+                to_block = min(head, self._cursor + LOG_POLL_MAX_BLOCK_RANGE)
+                entries = self._get_logs(web3, from_block, to_block)
+                # Only advance once the range has been delivered, failures will retry the same range.
+                self._deliver(entries, to_block)
+
+    def push_streamed(self, entries):
+        """Deliver entries received from the stream, ahead of the cursor."""
+        with self._new_entries:
+            # Removed logs were reorged out, the poller will deliver the canonical ones.
+            entries = [entry for entry in entries if not entry.get("removed") and entry["blockNumber"] > self._cursor]
+            # Each subscription skips what it already received, so one subscribing later still gets polled entries.
+            for subscription in self._subscriptions:
+                subscription.push_streamed([entry for entry in entries if subscription.matches(entry)])
+            if entries:
+                self._new_entries.notify_all()
+
+    def wait(self, subscription, timeout, after_stream_block=None):
+        """Block until the subscription has entries or the timeout (in seconds) elapses.
+
+        If after_stream_block is given, also returns once the stream block of the subscription is past it.
+        Returns whether the subscription has entries.
+        """
+        def ready():
+            if after_stream_block is not None and subscription.stream_block > after_stream_block:
+                return True
+            return subscription.has_entries()
+        with self._new_entries:
+            self._new_entries.wait_for(ready, timeout)
+            return subscription.has_entries()
+
+    def _deliver(self, entries, to_block):
+        with self._new_entries:
+            for subscription in self._subscriptions:
+                subscription.push([entry for entry in entries if subscription.matches(entry)], to_block)
+            self._cursor = to_block
+            if entries:
+                self._new_entries.notify_all()
+
+    def _get_logs(self, web3, from_block, to_block):
+        """Return all entries of interest to any subscriber within the block range, in chain order."""
+        _, addresses, topics = self.subscribed_filter()
+        if not addresses:
+            return []
+
+        entries = web3.eth.get_logs({
+            "address": [Web3.toChecksumAddress(addr) for addr in addresses],
+            "topics": [list(topics)],
+            "fromBlock": from_block,
+            "toBlock": to_block
+        })
+        logging.debug(f"LogPoller fetched {len(entries)} entries from blocks {from_block} to {to_block}")
+        return sorted(entries, key=lambda entry: (entry["blockNumber"], entry["logIndex"]))
+
+_log_poller = None
+_log_poller_lock = threading.Lock()
+def get_log_poller():
+    """Get the process-wide LogPoller instance."""
+    global _log_poller
+    with _log_poller_lock:
+        if _log_poller is None:
+            _log_poller = LogPoller()
+    return _log_poller
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+
+import websockets
+from web3._utils.method_formatters import log_entry_formatter
+from web3.datastructures import AttributeDict
+
+from constants.config import *
+from data_access.rpc_health import backoff_delay, endpoint_name
+
+def websocket_url(rpc_url):
+    return rpc_url.replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+
+class LogStream:
+    """Background eth_subscribe("logs") websocket subscription feeding a LogPoller.
+
+    Subscribes to the union of the poller's subscriptions and resubscribes whenever it changes.
+    While disconnected the poller falls back to regular polling, and it is asked to poll immediately on
+    reconnect so that the gap is backfilled from its cursor.
+    """
+
+    def __init__(self, poller, rpc_url=RPC_URL):
+        self.url = websocket_url(rpc_url)
+        self.connected = False
+        self.received = 0
+        self.reconnects = 0
+        self._connected_once = False
+        self._poller = poller
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        logging.info(f"Starting log stream from {endpoint_name(self.url)}")
+        self._thread.start()
+
+    def status_str(self):
+        return (
+            f"{'connected' if self.connected else 'disconnected'}, {self.received} logs received, "
+            f"{self.reconnects} reconnects"
+        )
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        try_count = 0
+        while True:
+            try:
+                loop.run_until_complete(self._stream())
+                try_count = 0
+            except Exception as e:
+                try_count += 1
+                if self.connected:
+                    logging.warning(f"Log stream disconnected, falling back to polling.\n{e}")
+                else:
+                    logging.warning(f"Log stream failed to connect.\n{e}")
+            self.connected = False
+            time.sleep(backoff_delay(try_count))
+
+    async def _stream(self):
+        """Stream logs until disconnected or the subscribed filter changes."""
+        filter_version, addresses, topics = self._poller.subscribed_filter()
+        async with websockets.connect(self.url, max_size=2**24, ping_interval=20, ping_timeout=20, close_timeout=5) as ws:
+            await ws.send(json.dumps({
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "eth_subscribe",
+                "params": ["logs", {"address": sorted(addresses), "topics": [sorted(topics)]}]
+            }))
+            response = json.loads(await asyncio.wait_for(ws.recv(), 10))
+            if "error" in response:
+                raise Exception(f"eth_subscribe failed: {response['error']}")
+            if self._connected_once:
+                self.reconnects += 1
+            self._connected_once = True
+            self.connected = True
+            # Backfill anything emitted while disconnected.
+            self._poller.request_poll()
+            logging.info(f"Log stream subscribed to {len(addresses)} addresses")
+
+            while self._poller.filter_version == filter_version:
+                try:
+                    message = await asyncio.wait_for(ws.recv(), 1)
+                except asyncio.TimeoutError:
+                    continue
+                data = json.loads(message)
+                if data.get("method") != "eth_subscription":
+                    continue
+                entry = AttributeDict.recursive(log_entry_formatter(data["params"]["result"]))
+                self.received += 1
+                self._poller.push_streamed([entry])
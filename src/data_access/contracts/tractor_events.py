@@ -1,30 +1,60 @@
+from bisect import bisect_left, bisect_right
+
 from bots.util import get_logs_by_names
-from web3.datastructures import AttributeDict
+from data_access.contracts.decoded_log import DecodedLog
 
 class TractorEvents:
     def __init__(self, receipt, decoded_logs):
         self.receipt = receipt
         # Events within Tractor execution contexts
-        self.tractor_events: list[list[AttributeDict]] = []
+        self.tractor_events: list[list[DecodedLog]] = []
         self.range: list[tuple[int, int]] = []
         self.operators: list[str] = []
         self.publishers: list[str] = []
 
         # Events not falling within a Tractor execution context
-        self.outer_events: list[AttributeDict] = []
+        self.outer_events: list[DecodedLog] = []
 
         evt_began = get_logs_by_names(["TractorExecutionBegan"], decoded_logs)
         evt_end = get_logs_by_names(["Tractor"], decoded_logs)
 
+        # First end event of each execution.
+        end_by_execution = {}
+        for end in evt_end:
+            end_by_execution.setdefault((end.args.blueprintHash, end.args.nonce), end)
+
+        # Sort once, each context is then a contiguous slice found by bisection.
+        sorted_logs = sorted(decoded_logs, key=lambda log: log.logIndex)
+        sorted_indices = [log.logIndex for log in sorted_logs]
+        # Number of contexts covering each position of sorted_logs, accumulated from range boundaries.
+        coverage = [0] * (len(sorted_logs) + 1)
         for start in evt_began:
-            end = [evt for evt in evt_end if evt.args.blueprintHash == start.args.blueprintHash and evt.args.nonce == start.args.nonce][0]
-            range = [start.logIndex, end.logIndex]
-            self.tractor_events.append(sorted([log for log in decoded_logs if range[0] <= log.logIndex <= range[1]], key=lambda x: x.logIndex))
-            self.range.append(range)
+            end = end_by_execution[(start.args.blueprintHash, start.args.nonce)]
+            log_range = [start.logIndex, end.logIndex]
+            first = bisect_left(sorted_indices, log_range[0])
+            last = bisect_right(sorted_indices, log_range[1])
+            self.tractor_events.append(sorted_logs[first:last])
+            self.range.append(log_range)
             self.operators.append(start.args.operator)
             self.publishers.append(start.args.publisher)
+            coverage[first] += 1
+            coverage[last] -= 1
+
+        covered = set()
+        depth = 0
+        for i, log in enumerate(sorted_logs):
+            depth += coverage[i]
+            if depth > 0:
+                covered.add(id(log))
+        self.outer_events = [log for log in decoded_logs if id(log) not in covered]
 
-        self.outer_events = [log for log in decoded_logs if not any(log in tractor_range for tractor_range in self.tractor_events)]
+        # Context lookup by index, in order of range start. Executions begin in log order, so this is also the order
+        # of the contexts. Running maximum of the range ends, to find the first context enclosing an index.
+        self._context_order = sorted(range(len(self.range)), key=lambda i: self.range[i][0])
+        self._context_starts = [self.range[i][0] for i in self._context_order]
+        self._context_max_ends = []
+        for i in self._context_order:
+            self._context_max_ends.append(max(self.range[i][1], self._context_max_ends[-1] if self._context_max_ends else -1))
 
     # Returns a list of all separate event contexts
     def all_separated_events(self):
@@ -32,7 +62,10 @@ class TractorEvents:
 
     # Returns all events matching the context of the given index (finds all other related events)
     def events_matching_index(self, index: int):
-        for i, (start, end) in enumerate(self.range):
-            if start <= index <= end:
-                return self.tractor_events[i]
+        # Contexts starting at or before the index, the first one ending at or after it encloses the index.
+        # With nested contexts, this is the outermost one.
+        last_started = bisect_right(self._context_starts, index)
+        position = bisect_left(self._context_max_ends, index)
+        if position < last_started:
+            return self.tractor_events[self._context_order[position]]
         return self.outer_events
@@ -1,3 +1,4 @@
+import copy
 import logging
 import json
 import os
@@ -7,11 +8,15 @@ import websockets
 import threading
 
 from web3 import HTTPProvider
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
 
 from constants.addresses import *
 from constants.config import *
 
 from constants import dry_run_entries
+from data_access.rpc_health import rpc_backoff
+from data_access.rpc_pool import PooledHTTPProvider
 
 with open(
     os.path.join(os.path.dirname(__file__), "../../constants/abi/erc20_abi.json")
@@ -53,6 +58,10 @@ with open(
     os.path.join(os.path.dirname(__file__), "../../constants/abi/spectra_abi.json")
 ) as spectra_abi_file:
     spectra_abi = json.load(spectra_abi_file)
+with open(
+    os.path.join(os.path.dirname(__file__), "../../constants/abi/multicall3_abi.json")
+) as multicall3_abi_file:
+    multicall3_abi = json.load(multicall3_abi_file)
 
 class ChainClient:
     """Base class for clients of Eth chain data."""
@@ -65,9 +74,17 @@ _thread_local = threading.local()
 def get_web3_instance():
     """Get an instance of web3 lib. Creates a new instance per thread if one doesn't exist."""
     if not hasattr(_thread_local, 'web3_instance'):
-        _thread_local.web3_instance = Web3(HTTPProvider(RPC_URL))
+        _thread_local.web3_instance = Web3(PooledHTTPProvider(RPC_URLS))
     return _thread_local.web3_instance
 
+def get_archive_web3_instance():
+    """Get an instance of web3 lib for heavy historical queries. Uses ARCHIVE_RPC_URL if configured."""
+    if not ARCHIVE_RPC_URL:
+        return get_web3_instance()
+    if not hasattr(_thread_local, 'archive_web3_instance'):
+        _thread_local.archive_web3_instance = Web3(PooledHTTPProvider([ARCHIVE_RPC_URL]))
+    return _thread_local.archive_web3_instance
+
 def get_well_contract(address, web3=get_web3_instance()):
     """Get a web.eth.contract object for a well. Contract is not thread safe."""
     return web3.eth.contract(address=address, abi=well_abi)
@@ -111,6 +128,10 @@ def get_curve_spectra_contract(address, is_legacy_abi, web3=get_web3_instance())
     address = web3.toChecksumAddress(address.lower())
     return web3.eth.contract(address=address, abi=(spectra_abi if not is_legacy_abi else legacy_spectra_abi))
 
+def get_multicall3_contract(web3=get_web3_instance()):
+    """Get a web3.eth.contract object for the Multicall3 contract."""
+    return web3.eth.contract(address=MULTICALL3_ADDR, abi=multicall3_abi)
+
 def get_tokens_sent(token, receipt, recipient, log_index_bounds):
     """Return the amount (as a float) of token sent in a transaction to the given recipient, within the log index bounds"""
     logs = get_erc20_transfer_logs(token, receipt, recipient=recipient, log_index_bounds=log_index_bounds)
@@ -139,16 +160,76 @@ def get_eth_sent(receipt, recipient, web3, log_index_bounds):
 def get_block(block_number="latest", web3=get_web3_instance()):
     return web3.eth.get_block(block_number)
 
+class BlockCallCache:
+    """Thread-safe cache of contract call results keyed by (contract address, calldata) per block.
+
+    State at a numbered block never changes, so results never need to be invalidated. Once more than
+    max_entries results are cached, all results of the oldest cached block are evicted. Results are copied
+    in and out, so a caller mutating a returned list or dict does not change what later callers get.
+    """
+
+    MISS = object()
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._blocks = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, block_number, key):
+        """Return the cached result, or BlockCallCache.MISS if it is not cached."""
+        with self._lock:
+            result = self._blocks.get(block_number, {}).get(key, BlockCallCache.MISS)
+            if result is BlockCallCache.MISS:
+                self.misses += 1
+            else:
+                self.hits += 1
+                result = copy.deepcopy(result)
+            return result
+
+    def put(self, block_number, key, result):
+        result = copy.deepcopy(result)
+        with self._lock:
+            block_results = self._blocks.setdefault(block_number, {})
+            if key not in block_results:
+                self._size += 1
+            block_results[key] = result
+            while self._size > self.max_entries and len(self._blocks) > 1:
+                self._size -= len(self._blocks.pop(min(self._blocks)))
+
+    def stats_str(self):
+        with self._lock:
+            total = self.hits + self.misses
+            hit_rate = self.hits / total if total else 0
+            return f"{self._size} cached over {len(self._blocks)} blocks, {self.hits} hits, {self.misses} misses ({hit_rate:.1%} hit rate)"
+
+contract_call_cache = BlockCallCache(CONTRACT_CALL_CACHE_SIZE)
+
+def call_cache_key(function):
+    return (function.address, function._encode_transaction_data())
+
 def call_contract_function_with_retry(function, max_tries=10, block_number="latest"):
-    """Try to call a web3 contract object function and retry with exponential backoff."""
+    """Try to call a web3 contract object function and retry with the endpoint's shared backoff.
+
+    Results at numbered blocks are served from contract_call_cache, "latest" always reaches the chain.
+    """
+    if isinstance(block_number, int):
+        result = contract_call_cache.get(block_number, call_cache_key(function))
+        if result is not BlockCallCache.MISS:
+            return result
     try_count = 1
     while True:
         try:
-            return function.call(block_identifier=block_number)
+            result = function.call(block_identifier=block_number)
+            if isinstance(block_number, int):
+                contract_call_cache.put(block_number, call_cache_key(function), result)
+            return result
         except Exception as e:
             if try_count < max_tries:
+                rpc_backoff(function.web3, try_count)
                 try_count += 1
-                time.sleep(0.5)
                 continue
             else:
                 logging.error(
@@ -156,6 +237,51 @@ def call_contract_function_with_retry(function, max_tries=10, block_number="late
                 )
                 raise (e)
 
+def call_contract_functions_with_retry(functions, max_tries=10, block_number="latest"):
+    """Call several web3 contract object functions in a single Multicall3 aggregate3 call.
+
+    Returns the decoded result of each function, in order, as call_contract_function_with_retry would.
+    Failures are isolated per call: any call that fails within the multicall is retried individually.
+    Results already in contract_call_cache are not requested again.
+    """
+    retval = [BlockCallCache.MISS] * len(functions)
+    if isinstance(block_number, int):
+        for i in range(len(functions)):
+            retval[i] = contract_call_cache.get(block_number, call_cache_key(functions[i]))
+    uncached = [i for i in range(len(retval)) if retval[i] is BlockCallCache.MISS]
+    if len(uncached) <= 1:
+        for i in uncached:
+            retval[i] = call_contract_function_with_retry(functions[i], max_tries=max_tries, block_number=block_number)
+        return retval
+
+    multicall_contract = get_multicall3_contract(web3=functions[0].web3)
+    calls = [(functions[i].address, True, functions[i]._encode_transaction_data()) for i in uncached]
+    results = call_contract_function_with_retry(
+        multicall_contract.functions.aggregate3(calls), max_tries=max_tries, block_number=block_number
+    )
+
+    for i, (success, return_data) in zip(uncached, results):
+        function = functions[i]
+        if success:
+            try:
+                retval[i] = decode_function_output(function, return_data)
+                if isinstance(block_number, int):
+                    contract_call_cache.put(block_number, call_cache_key(function), retval[i])
+                continue
+            except Exception as e:
+                logging.warning(f'Failed to decode multicall result of "{function.fn_name}": {e}')
+        retval[i] = call_contract_function_with_retry(function, max_tries=max_tries, block_number=block_number)
+    return retval
+
+def decode_function_output(function, return_data):
+    """Decode the raw return data of a web3 contract object function the same way as function.call()."""
+    output_types = get_abi_output_types(function.abi)
+    output_data = function.web3.codec.decode(output_types, return_data)
+    normalized_data = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, output_data)
+    if len(normalized_data) == 1:
+        return normalized_data[0]
+    return normalized_data
+
 def get_erc20_transfer_logs(token, receipt, sender=None, recipient=None, log_index_bounds=[0,999999999]):
     """Return all logs matching transfer signature to the recipient before the end index."""
     if sender is None and recipient is None:
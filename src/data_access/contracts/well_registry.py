@@ -0,0 +1,215 @@
+from eth_utils import event_abi_to_log_topic
+from hexbytes import HexBytes
+from web3 import Web3
+
+from data_access.contracts.decoded_log import DecodedLog
+from data_access.contracts.erc20 import Erc20Info, erc20_info_cache
+from data_access.contracts.log_backfill import backfill_logs
+from data_access.contracts.util import *
+
+BORE_WELL_ABI = next(abi for abi in aquifer_abi if abi.get("type") == "event" and abi["name"] == "BoreWell")
+BORE_WELL_TOPIC = "0x" + event_abi_to_log_topic(BORE_WELL_ABI).hex()
+
+class WellInfo:
+    """Static configuration of a well, as bored by the Aquifer."""
+
+    def __init__(self, address, implementation, tokens, well_function, pumps, well_data, block_number):
+        self.address = address
+        self.implementation = implementation
+        self.tokens = tokens
+        # (target, data) calls.
+        self.well_function = well_function
+        self.pumps = pumps
+        self.well_data = well_data
+        self.block_number = block_number
+
+    @classmethod
+    def from_bore_well_args(cls, args, block_number):
+        return cls(
+            args["well"],
+            args["implementation"],
+            list(args["tokens"]),
+            (args["wellFunction"][0], HexBytes(args["wellFunction"][1]).hex()),
+            [(pump[0], HexBytes(pump[1]).hex()) for pump in args["pumps"]],
+            HexBytes(args["wellData"]).hex(),
+            block_number,
+        )
+
+    def to_json(self):
+        return {
+            "implementation": self.implementation,
+            "tokens": self.tokens,
+            "well_function": list(self.well_function),
+            "pumps": [list(pump) for pump in self.pumps],
+            "well_data": self.well_data,
+            "block_number": self.block_number,
+        }
+
+    @classmethod
+    def from_json(cls, address, data):
+        return cls(
+            address,
+            data["implementation"],
+            data["tokens"],
+            tuple(data["well_function"]),
+            [tuple(pump) for pump in data["pumps"]],
+            data["well_data"],
+            data["block_number"],
+        )
+
+class WellRegistry:
+    """Tokens, well function, pumps and ERC-20 metadata of every well bored by the Aquifer.
+
+    Loaded from a JSON file, then brought up to date with a backfill of BoreWell logs from the last synced block.
+    ERC-20 metadata of the well tokens is fetched with multicall and seeded into the get_erc20_info cache, so
+    lookups on the alert path are in memory. Wells not bored by the Aquifer, or looked up before the registry is
+    loaded, are queried once and remembered.
+    """
+
+    def __init__(self, path=WELL_REGISTRY_PATH, aquifer=AQUIFER_ADDR):
+        self.path = path
+        self.aquifer = aquifer
+        self._lock = threading.Lock()
+        self._wells = {}
+        self._erc20_infos = {}
+        self._synced_block = None
+
+    def load(self):
+        """Load the persisted registry and backfill the BoreWell events since it was saved."""
+        self._read()
+        from_block = AQUIFER_DEPLOY_BLOCK if self._synced_block is None else self._synced_block + 1
+        to_block = get_archive_web3_instance().eth.block_number
+        if from_block <= to_block:
+            codec = get_web3_instance().codec
+            entries = backfill_logs([self.aquifer], [[BORE_WELL_TOPIC]], from_block, to_block)
+            for entry in entries:
+                bore_well = DecodedLog.from_log(codec, BORE_WELL_ABI, entry, None)
+                if bore_well is not None:
+                    self._add_well(WellInfo.from_bore_well_args(bore_well.args, entry["blockNumber"]))
+            self._synced_block = to_block
+        self._load_erc20_infos()
+        self._write()
+        logging.info(f"Well registry loaded {len(self._wells)} wells and {len(self._erc20_infos)} tokens")
+
+    def load_in_background(self):
+        """Load the registry in a background thread. Until then, lookups query wells on demand."""
+        threading.Thread(target=self._load_once, name="well-registry", daemon=True).start()
+
+    def _load_once(self):
+        try:
+            self.load()
+        except Exception as e:
+            logging.warning(f"Failed to load the well registry, unknown wells will be queried on use\n{e}", exc_info=True)
+
+    def add_bore_well(self, event_log):
+        """Register a well from a live BoreWell event."""
+        well_info = WellInfo.from_bore_well_args(event_log.args, event_log.blockNumber)
+        self._add_well(well_info)
+        self._load_erc20_infos()
+        self._write()
+
+    def get(self, well):
+        """WellInfo of a well bored by the Aquifer, or None."""
+        with self._lock:
+            return self._wells.get(well.lower())
+
+    def tokens(self, well):
+        well_info = self.get(well)
+        if well_info is not None:
+            return well_info.tokens
+        # Not bored by this Aquifer, its tokens still never change.
+        tokens = call_contract_function_with_retry(get_well_contract(Web3.to_checksum_address(well)).functions.tokens())
+        with self._lock:
+            self._wells[well.lower()] = WellInfo(Web3.to_checksum_address(well), None, list(tokens), None, [], None, None)
+        return tokens
+
+    def _add_well(self, well_info):
+        with self._lock:
+            self._wells[well_info.address.lower()] = well_info
+
+    def _load_erc20_infos(self):
+        """Fetch the metadata of well tokens not yet known, with one multicall per chunk of tokens."""
+        with self._lock:
+            tokens = set(token.lower() for well_info in self._wells.values() for token in well_info.tokens)
+            missing = [token for token in tokens if token not in self._erc20_infos and token not in erc20_info_cache]
+        for i in range(0, len(missing), WELL_REGISTRY_MULTICALL_SIZE):
+            chunk = missing[i:i + WELL_REGISTRY_MULTICALL_SIZE]
+            functions = []
+            for token in chunk:
+                contract = get_erc20_contract(token)
+                functions.extend([contract.functions.name(), contract.functions.symbol(), contract.functions.decimals()])
+            try:
+                results = call_contract_functions_with_retry(functions)
+            except Exception as e:
+                logging.warning(f"Failed to load erc20 info of {len(chunk)} well tokens, they will be queried on use\n{e}")
+                continue
+            for j, token in enumerate(chunk):
+                name, symbol, decimals = results[3 * j:3 * j + 3]
+                # Use custom in-house Beanstalk Symbol name, if set, otherwise default to on-chain symbol.
+                symbol = SILO_TOKENS_MAP.get(token) or symbol
+                with self._lock:
+                    self._erc20_infos[token] = Erc20Info(token, name, symbol, decimals)
+        with self._lock:
+            for token, erc20_info in self._erc20_infos.items():
+                erc20_info_cache.setdefault(token, erc20_info)
+
+    def _read(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as registry_file:
+                data = json.load(registry_file)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable well registry {self.path}\n{e}")
+            return
+        if data.get("aquifer", "").lower() != self.aquifer.lower():
+            return
+        with self._lock:
+            self._synced_block = data["synced_block"]
+            for address, well_data in data["wells"].items():
+                self._wells[address.lower()] = WellInfo.from_json(address, well_data)
+            for token, info in data["erc20"].items():
+                self._erc20_infos[token] = Erc20Info(token, info["name"], info["symbol"], info["decimals"])
+
+    def _write(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                "aquifer": self.aquifer,
+                "synced_block": self._synced_block,
+                "wells": {
+                    well_info.address: well_info.to_json()
+                    for well_info in self._wells.values()
+                    if well_info.implementation is not None
+                },
+                "erc20": {
+                    token: {"name": info.name, "symbol": info.symbol, "decimals": info.decimals}
+                    for token, info in self._erc20_infos.items()
+                },
+            }
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Replace the file atomically, other bot processes may be reading it.
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as registry_file:
+                json.dump(data, registry_file, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Failed to persist well registry to {self.path}\n{e}")
+
+_well_registry = None
+_well_registry_lock = threading.Lock()
+def get_well_registry():
+    """Get the process-wide WellRegistry, starting to load it in the background on first use.
+
+    Until the load completes, or if the backfill fails, the registry serves what it has and queries unknown wells on use.
+    """
+    global _well_registry
+    with _well_registry_lock:
+        if _well_registry is None:
+            _well_registry = WellRegistry()
+            _well_registry.load_in_background()
+        return _well_registry
@@ -0,0 +1,448 @@
+import math
+from collections import OrderedDict
+
+from hexbytes import HexBytes
+from web3 import Web3
+
+from data_access.contracts.bean import BeanClient
+from data_access.contracts.decoded_log import DecodedLog
+from data_access.contracts.decoded_receipt import event_abis_by_topic
+from data_access.contracts.erc20 import get_erc20_info
+from data_access.contracts.log_poller import get_log_poller
+from data_access.contracts.util import *
+from data_access.contracts.well_registry import get_well_registry
+
+# Well events that change reserves or LP supply.
+RESERVE_EVENT_ABIS = {
+    topic: event_abi
+    for topic, event_abi in event_abis_by_topic(well_abi).items()
+    if event_abi["name"] in ["Swap", "AddLiquidity", "RemoveLiquidity", "RemoveLiquidityOneToken", "Shift", "Sync"]
+}
+
+class ConstantProduct2:
+    """Well function with reserves x * y = k."""
+
+    def rate(self, bean_reserve, token_reserve):
+        """Marginal amount of the non-bean token per bean. Reserves are floats in token units."""
+        return token_reserve / bean_reserve
+
+    def peg_bean_reserve(self, bean_reserve, token_reserve, token_usd):
+        """Bean reserve at which a bean is worth $1 in this well."""
+        return math.sqrt(bean_reserve * token_reserve * token_usd)
+
+class Stable2:
+    """Well function with the 2 token stableswap invariant, reserves scaled to a common precision.
+
+    4A(x + y) + D = 4AD + D^3 / (4xy)
+
+    The amplification A is not part of the well function data, it is fitted against the price contract.
+    """
+
+    def __init__(self, a=STABLE2_A):
+        self.a = a
+
+    def invariant(self, x, y):
+        a = self.a
+        d = x + y
+        for _ in range(255):
+            d_p = d ** 3 / (4 * x * y)
+            prev_d = d
+            d = (4 * a * (x + y) + 2 * d_p) * d / ((4 * a - 1) * d + 3 * d_p)
+            if abs(d - prev_d) <= 1e-12 * d:
+                break
+        return d
+
+    def other_reserve(self, x, d):
+        """Reserve y on the invariant curve D given reserve x."""
+        c = d ** 3 / (16 * self.a * x)
+        b = x + d / (4 * self.a)
+        return ((d - b) + math.sqrt((d - b) ** 2 + 4 * c)) / 2
+
+    def rate(self, bean_reserve, token_reserve):
+        d_p = self.invariant(bean_reserve, token_reserve) ** 3 / 4
+        return (4 * self.a + d_p / (bean_reserve ** 2 * token_reserve)) / (4 * self.a + d_p / (bean_reserve * token_reserve ** 2))
+
+    def peg_bean_reserve(self, bean_reserve, token_reserve, token_usd):
+        # Bisect along the current invariant for the bean reserve where a bean buys $1 of the token.
+        target_rate = 1 / token_usd
+        d = self.invariant(bean_reserve, token_reserve)
+        low, high = d * 1e-9, d
+        for _ in range(200):
+            mid = (low + high) / 2
+            if self.rate(mid, self.other_reserve(mid, d)) > target_rate:
+                low = mid
+            else:
+                high = mid
+        return (low + high) / 2
+
+    @staticmethod
+    def fit(bean_reserve, token_reserve, price, delta_b, tolerance):
+        """Stable2 whose A reproduces the bean price and deltaB of the reserves within tolerance, or None.
+
+        All amounts are floats in token units, price is in USD.
+        """
+        def fitted_delta_b(a):
+            well_function = Stable2(a)
+            token_usd = price / well_function.rate(bean_reserve, token_reserve)
+            return well_function.peg_bean_reserve(bean_reserve, token_reserve, token_usd) - bean_reserve
+
+        # The curve flattens as A grows, so more beans are needed to restore the peg.
+        low, high = math.log(1e-2), math.log(1e4)
+        for _ in range(60):
+            mid = (low + high) / 2
+            if abs(fitted_delta_b(math.exp(mid))) < abs(delta_b):
+                low = mid
+            else:
+                high = mid
+        a = math.exp((low + high) / 2)
+        if abs(fitted_delta_b(a) - delta_b) > tolerance:
+            return None
+        return Stable2(a)
+
+class WellReserveState:
+    """Reserves and LP supply of a well, updated from its events."""
+
+    def __init__(self, address, tokens, bean_index, decimals, well_function):
+        self.address = address
+        self.tokens = tokens
+        self.bean_index = bean_index
+        self.token_index = 1 - bean_index
+        self.decimals = decimals
+        self.well_function = well_function
+        self.reserves = None
+        self.lp_supply = None
+        # USD price of the non-bean token, calibrated against the price contract at each drift check.
+        self.token_usd = None
+        self.lp_bdv = None
+        # Whether the local deltaB matched the price contract at the last check.
+        self.verified = False
+        # (blockNumber, logIndex) of the last event applied.
+        self.position = (0, 0)
+
+    def apply(self, event, args):
+        reserves = list(self.reserves)
+        if event == "Swap":
+            reserves[self._index(args["fromToken"])] += args["amountIn"]
+            reserves[self._index(args["toToken"])] -= args["amountOut"]
+        elif event == "AddLiquidity":
+            reserves = [reserve + amount for reserve, amount in zip(reserves, args["tokenAmountsIn"])]
+            self.lp_supply += args["lpAmountOut"]
+        elif event == "RemoveLiquidity":
+            reserves = [reserve - amount for reserve, amount in zip(reserves, args["tokenAmountsOut"])]
+            self.lp_supply -= args["lpAmountIn"]
+        elif event == "RemoveLiquidityOneToken":
+            reserves[self._index(args["tokenOut"])] -= args["tokenAmountOut"]
+            self.lp_supply -= args["lpAmountIn"]
+        elif event == "Shift":
+            reserves = list(args["reserves"])
+        elif event == "Sync":
+            reserves = list(args["reserves"])
+            self.lp_supply += args["lpAmountOut"]
+        self.reserves = reserves
+
+    def has_reserves(self, reserves=None):
+        return all(reserve > 0 for reserve in (reserves or self.reserves))
+
+    def rate(self, reserves=None):
+        """Marginal amount of the non-bean token per bean, None if a reserve is empty."""
+        if not self.has_reserves(reserves):
+            return None
+        bean_reserve, token_reserve = self._float_reserves(reserves or self.reserves)
+        return self.well_function.rate(bean_reserve, token_reserve)
+
+    def pool_info(self):
+        """Pool info in the format of BeanClient.map_price_info.
+
+        A well with an empty reserve has no price. Returns None if the USD price of the token is unknown.
+        """
+        if not self.has_reserves():
+            price = liquidity = bean_liquidity = non_bean_liquidity = delta_b = 0
+        elif self.token_usd is None:
+            return None
+        else:
+            bean_reserve, token_reserve = self._float_reserves(self.reserves)
+            price = self.well_function.rate(bean_reserve, token_reserve) * self.token_usd
+            bean_liquidity = bean_reserve * price
+            non_bean_liquidity = token_reserve * self.token_usd
+            liquidity = bean_liquidity + non_bean_liquidity
+            delta_b = self.well_function.peg_bean_reserve(bean_reserve, token_reserve, self.token_usd) - bean_reserve
+        return {
+            "pool": self.address,
+            "tokens": self.tokens,
+            "balances": list(self.reserves),
+            "price": int(price * 10 ** BEAN_DECIMALS),
+            "liquidity": int(liquidity * 10 ** BEAN_DECIMALS),
+            "bean_liquidity": int(bean_liquidity * 10 ** BEAN_DECIMALS),
+            "non_bean_liquidity": int(non_bean_liquidity * 10 ** BEAN_DECIMALS),
+            "delta_b": int(delta_b * 10 ** BEAN_DECIMALS),
+            "lp_usd": int(liquidity / token_to_float(self.lp_supply, WELL_LP_DECIMALS) * 10 ** BEAN_DECIMALS) if self.lp_supply else 0,
+            "lp_bdv": self.lp_bdv,
+        }
+
+    def verify(self, pool_info):
+        """Compare the local deltaB at the on-chain reserves to the price contract, refitting Stable2 if needed."""
+        local_pool_info = self.pool_info()
+        if local_pool_info is None:
+            self.verified = False
+            return
+        tolerance = max(WELL_RESERVES_DRIFT_TOLERANCE * self.reserves[self.bean_index], 10 ** BEAN_DECIMALS)
+        self.verified = abs(local_pool_info["delta_b"] - pool_info["delta_b"]) <= tolerance
+        if not self.verified and isinstance(self.well_function, Stable2):
+            bean_reserve, token_reserve = self._float_reserves(self.reserves)
+            well_function = Stable2.fit(
+                bean_reserve,
+                token_reserve,
+                token_to_float(pool_info["price"], BEAN_DECIMALS),
+                token_to_float(pool_info["delta_b"], BEAN_DECIMALS),
+                token_to_float(tolerance, BEAN_DECIMALS),
+            )
+            if well_function is not None:
+                logging.info(f"Fitted Stable2 A of {self.address} to {well_function.a:.4g} (was {self.well_function.a:.4g})")
+                self.well_function = well_function
+                self.token_usd = token_to_float(pool_info["price"], BEAN_DECIMALS) / self.rate()
+                self.verified = True
+
+    def _index(self, token):
+        return 0 if token.lower() == self.tokens[0].lower() else 1
+
+    def _float_reserves(self, reserves):
+        return (
+            token_to_float(reserves[self.bean_index], self.decimals[self.bean_index]),
+            token_to_float(reserves[self.token_index], self.decimals[self.token_index]),
+        )
+
+class WellReserveEngine:
+    """Prices the wells locally from their reserves, kept current from the well events already ingested.
+
+    Reserves and LP supply are loaded from the price contract, then updated with each Swap, AddLiquidity,
+    RemoveLiquidity(OneToken), Shift and Sync event delivered by the shared log poller. Price, deltaB and LP value are
+    evaluated with the well function (ConstantProduct2 or Stable2), with no RPC calls.
+
+    Every WELL_RESERVES_CHECK_BLOCKS blocks the local state is compared to the price contract. Reserve drift is
+    logged and resynced, and the USD price of each non-bean token is recalibrated. The local deltaB is then compared
+    to the price contract, and blocks are not served locally while any well disagrees.
+    """
+
+    def __init__(self, wells):
+        self.wells = [Web3.to_checksum_address(well) for well in wells]
+        self.drift_count = 0
+        self.check_count = 0
+        # Largest relative error of the local prices found at a check, before recalibration.
+        self.max_price_error = 0.0
+        self._states = {}
+        self._lock = threading.Lock()
+        self._state_changed = threading.Condition(self._lock)
+        # Block to {well: pool info} after the events of that block, for the last WELL_RESERVES_HISTORY_BLOCKS blocks
+        # with events. Blocks without events share the state of the last recorded block before them.
+        self._history = OrderedDict()
+        # Last block whose events have all been applied.
+        self._state_block = None
+        self._checked_block = None
+        self._resync_requested = False
+        self._subscription = None
+        self._thread = threading.Thread(target=self._run, name="well-reserves", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def price_infos(self, block_number, timeout=WELL_RESERVES_WAIT):
+        """Overall price info of the whitelisted wells and the price info of all tracked wells at the block.
+
+        Both are in the format of BeanClient.map_price_info, as returned by get_price_info_with_wells. Waits up to
+        timeout seconds for the events of the block to be applied. Returns None if the block is not covered or a
+        well could not be verified against the price contract.
+        """
+        deadline = time.time() + timeout
+        with self._state_changed:
+            if self._state_block is None:
+                # Not synced yet, do not hold up callers that can fall back to the price contract.
+                return None
+            while self._state_block < block_number:
+                if time.time() >= deadline:
+                    return None
+                self._state_changed.wait(deadline - time.time())
+            recorded_blocks = [block for block in self._history if block <= block_number]
+            if not recorded_blocks:
+                return None
+            pool_infos = self._history[recorded_blocks[-1]]
+        if pool_infos is None:
+            return None
+        whitelisted = {well: pool_info for well, pool_info in pool_infos.items() if well in WHITELISTED_WELLS}
+        return WellReserveEngine.aggregate(whitelisted), WellReserveEngine.aggregate(pool_infos)
+
+    def latest_price_info(self):
+        """Overall price info of the whitelisted wells at the latest block, or None before the first sync."""
+        with self._lock:
+            block_number = self._state_block
+        if block_number is None:
+            return None
+        price_infos = self.price_infos(block_number, timeout=0)
+        return price_infos[0] if price_infos else None
+
+    def status_str(self):
+        with self._lock:
+            return (
+                f"state at block {self._state_block}, checked at {self._checked_block}, "
+                f"{self.drift_count} drifts in {self.check_count} checks, max price error {self.max_price_error:.2%}, "
+                f"{sum(not state.verified for state in self._states.values())} unverified wells"
+            )
+
+    @staticmethod
+    def aggregate(pool_infos):
+        """Liquidity weighted price, total liquidity and deltaB of the pools, as computed by the price contract."""
+        liquidity = sum(pool_info["liquidity"] for pool_info in pool_infos.values())
+        return {
+            "price": sum(pool_info["price"] * pool_info["liquidity"] for pool_info in pool_infos.values()) // liquidity if liquidity else 0,
+            "liquidity": liquidity,
+            "delta_b": sum(pool_info["delta_b"] for pool_info in pool_infos.values()),
+            "pool_infos": dict(pool_infos),
+        }
+
+    def _run(self):
+        retry_count = 0
+        while True:
+            try:
+                if self._subscription is None:
+                    self._subscription = get_log_poller().subscribe(self.wells, list(RESERVE_EVENT_ABIS))
+                if self._checked_block is None:
+                    # Entries keep accumulating in the subscription until the initial sync succeeds.
+                    self._init_states()
+                    self._check(self._subscription.start_block - 1)
+                self._process_new_entries()
+                retry_count = 0
+            except Exception as e:
+                retry_count += 1
+                # Only the first failure of a streak is an error, retries are expected to hit the same issue.
+                log = logging.error if retry_count == 1 else logging.warning
+                log(f"Well reserve engine failed {retry_count} times, resyncing\n{e}", exc_info=retry_count == 1)
+                with self._lock:
+                    self._resync_requested = True
+                time.sleep(min(60, 2 ** retry_count))
+
+    def _init_states(self):
+        registry = get_well_registry()
+        for well in self.wells:
+            tokens = registry.tokens(well)
+            bean_index = 0 if tokens[0].lower() == BEAN_ADDR.lower() else 1
+            decimals = [get_erc20_info(token).decimals for token in tokens]
+            well_info = registry.get(well)
+            if well_info is not None and well_info.well_function is not None:
+                well_function_data = well_info.well_function[1]
+            else:
+                well_function_data = call_contract_function_with_retry(get_well_contract(well).functions.wellFunction())[1]
+            # ConstantProduct2 takes no data, Stable2 is configured with the decimals of both tokens.
+            well_function = Stable2() if len(HexBytes(well_function_data)) > 0 else ConstantProduct2()
+            self._states[well] = WellReserveState(well, tokens, bean_index, decimals, well_function)
+
+    def _process_new_entries(self):
+        get_log_poller().wait(self._subscription, BLOCK_CLOCK_INTERVAL * 5, after_stream_block=self._state_block)
+        # Read before draining, so that all entries the stream pushed up to it are drained.
+        stream_block = self._subscription.stream_block
+        entries, synced_block = self._subscription.drain()
+        entries.sort(key=lambda entry: (entry["blockNumber"], entry["logIndex"]))
+        codec = get_web3_instance().codec
+        with self._state_changed:
+            for i, entry in enumerate(entries):
+                state = self._states[Web3.to_checksum_address(entry["address"])]
+                position = (entry["blockNumber"], entry["logIndex"])
+                if position <= state.position:
+                    if position < state.position and entry["blockNumber"] > self._checked_block:
+                        # Delivered out of order, absolute reserves of Shift/Sync can no longer be trusted.
+                        self._resync_requested = True
+                    continue
+                event_abi = RESERVE_EVENT_ABIS[entry["topics"][0].hex()]
+                decoded_log = DecodedLog.from_log(codec, event_abi, entry, None)
+                if decoded_log is None:
+                    continue
+                state.apply(event_abi["name"], decoded_log.args)
+                state.position = position
+                if i == len(entries) - 1 or entries[i + 1]["blockNumber"] != entry["blockNumber"]:
+                    self._record(entry["blockNumber"])
+            # The stream pushes one log at a time, so the newest block seen may still be missing some of its logs.
+            new_state_block = max([synced_block, stream_block] + [entry["blockNumber"] - 1 for entry in entries])
+            if new_state_block > self._state_block:
+                self._state_block = new_state_block
+                self._state_changed.notify_all()
+            check_block = self._state_block
+            check_due = self._resync_requested or check_block - self._checked_block >= WELL_RESERVES_CHECK_BLOCKS
+        if check_due:
+            self._check(check_block)
+
+    def _check(self, block_number):
+        """Compare the local state to the price contract at the block, resync it and recalibrate token prices."""
+        price_info = BeanClient().get_price_for_wells(self.wells, block_number=block_number)
+        lp_supplies = call_contract_functions_with_retry(
+            [get_well_contract(well).functions.totalSupply() for well in self.wells], block_number=block_number
+        )
+        with self._state_changed:
+            drifted = False
+            for well, lp_supply in zip(self.wells, lp_supplies):
+                state = self._states[well]
+                pool_info = price_info["pool_infos"][well]
+                reserves = list(pool_info["balances"])
+                if state.reserves is not None and state.position[0] <= block_number and (state.reserves != reserves or state.lp_supply != lp_supply):
+                    drifted = True
+                    logging.warning(
+                        f"Well reserve drift in {well} at block {block_number}: local {state.reserves} LP {state.lp_supply}, "
+                        f"on-chain {reserves} LP {lp_supply}. Resyncing"
+                    )
+                local_pool_info = state.pool_info() if state.reserves is not None else None
+                if local_pool_info is not None and pool_info["price"] > 0 and state.position[0] <= block_number:
+                    # Mostly the USD price of the token moving since the last check.
+                    price_error = abs(local_pool_info["price"] - pool_info["price"]) / pool_info["price"]
+                    self.max_price_error = max(self.max_price_error, price_error)
+                    if price_error > WELL_RESERVES_PRICE_TOLERANCE:
+                        logging.warning(
+                            f"Local price of {well} was off by {price_error:.2%} at block {block_number}: "
+                            f"local {local_pool_info['price']}, on-chain {pool_info['price']}"
+                        )
+                state.reserves = reserves
+                state.lp_supply = lp_supply
+                state.lp_bdv = pool_info["lp_bdv"]
+                state.position = max(state.position, (block_number, float("inf")))
+                # Bean price in the well is the marginal rate times the USD price of the non-bean token.
+                rate = state.rate(reserves)
+                state.token_usd = token_to_float(pool_info["price"], BEAN_DECIMALS) / rate if rate and pool_info["price"] > 0 else None
+                was_verified = state.verified
+                state.verify(pool_info)
+                if was_verified and not state.verified:
+                    logging.warning(
+                        f"Local deltaB of {well} disagrees with the price contract at block {block_number}, "
+                        f"on-chain {pool_info['delta_b']}. Falling back to the price contract"
+                    )
+            self.check_count += 1
+            self.drift_count += drifted
+            self._resync_requested = False
+            self._checked_block = block_number
+            if drifted:
+                self._history.clear()
+            self._record(block_number)
+            if self._state_block is None or block_number > self._state_block:
+                self._state_block = block_number
+            self._state_changed.notify_all()
+
+    def _record(self, block_number):
+        pool_infos = {well: state.pool_info() for well, state in self._states.items()}
+        if any(pool_info is None or not self._states[well].verified for well, pool_info in pool_infos.items()):
+            # Not served locally, price_infos falls back to the price contract.
+            pool_infos = None
+        self._history[block_number] = pool_infos
+        self._history.move_to_end(block_number)
+        while len(self._history) > WELL_RESERVES_HISTORY_BLOCKS:
+            self._history.popitem(last=False)
+
+_well_reserve_engine = None
+_well_reserve_engine_lock = threading.Lock()
+def get_well_reserve_engine():
+    """Get the process-wide WellReserveEngine of the whitelisted and dewhitelisted wells, started on first use.
+
+    Returns None if LOCAL_WELL_PRICING is disabled.
+    """
+    global _well_reserve_engine
+    if not LOCAL_WELL_PRICING:
+        return None
+    with _well_reserve_engine_lock:
+        if _well_reserve_engine is None:
+            _well_reserve_engine = WellReserveEngine([*WHITELISTED_WELLS, *DEWHITELISTED_WELLS])
+            _well_reserve_engine.start()
+        return _well_reserve_engine
@@ -0,0 +1,173 @@
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+from constants.config import *
+
+def endpoint_name(endpoint):
+    """Host of the endpoint uri, safe to log since api keys are usually part of the path."""
+    return urlparse(endpoint).netloc or endpoint
+
+def backoff_delay(try_count, base_delay=RPC_BACKOFF_BASE, max_delay=RPC_BACKOFF_MAX):
+    """Jittered exponential backoff delay (in seconds) before retry number try_count."""
+    delay = min(max_delay, base_delay * 2 ** max(0, try_count - 1))
+    return random.uniform(delay / 2, delay)
+
+# Fragments of the errors providers return when a query spans too many blocks or results.
+LOG_RANGE_ERROR_MESSAGES = [
+    "more than",
+    "too many",
+    "limit exceeded",
+    "block range",
+    "range is too large",
+    "response size",
+    "query timeout",
+]
+
+def is_log_range_error(error):
+    """Whether the provider rejected an eth_getLogs query for being too large, so it should be split."""
+    message = str(error).lower()
+    return any(fragment in message for fragment in LOG_RANGE_ERROR_MESSAGES)
+
+def is_endpoint_error(method, error):
+    """Whether an error returned for the request means the endpoint is unhealthy.
+
+    Reverts and eth_getLogs queries rejected for being too large are answers from a healthy endpoint.
+    """
+    if "revert" in str(error).lower():
+        return False
+    return not (method == "eth_getLogs" and is_log_range_error(error))
+
+class RpcHealth:
+    """Health of a single RPC endpoint, shared by every thread and Web3 instance using that endpoint.
+
+    Requests are limited by a token bucket, and a circuit breaker stops all requests for a while after
+    repeated consecutive failures. Retry loops should wait with rpc_backoff(), which also waits out an open circuit.
+    """
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.rate_limit = RPC_RATE_LIMIT
+        self.burst = RPC_RATE_BURST
+        self.requests = 0
+        self.failures = 0
+        self.throttled = 0
+        self.circuit_opened_count = 0
+        self._tokens = self.burst
+        self._last_refill = time.monotonic()
+        self._consecutive_failures = 0
+        self._circuit_open_until = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent to the endpoint."""
+        throttled = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._circuit_open_until - now
+                if wait <= 0:
+                    self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate_limit)
+                    self._last_refill = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self.requests += 1
+                        return
+                    wait = (1 - self._tokens) / self.rate_limit
+                if not throttled:
+                    throttled = True
+                    self.throttled += 1
+            time.sleep(wait)
+
+    def record_success(self):
+        with self._lock:
+            if self._consecutive_failures >= RPC_CIRCUIT_FAILURE_THRESHOLD:
+                logging.info(f"RPC circuit closed for {self.endpoint}")
+                self._circuit_open_until = 0
+            self._consecutive_failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._consecutive_failures += 1
+            # Also re-opens a circuit on the first failure after the reset timeout.
+            if self._consecutive_failures >= RPC_CIRCUIT_FAILURE_THRESHOLD and time.monotonic() >= self._circuit_open_until:
+                self._circuit_open_until = time.monotonic() + RPC_CIRCUIT_RESET_TIMEOUT
+                self.circuit_opened_count += 1
+                logging.warning(
+                    f"RPC circuit opened for {self.endpoint} after {self._consecutive_failures} consecutive failures. "
+                    f"Pausing requests for {RPC_CIRCUIT_RESET_TIMEOUT} seconds."
+                )
+
+    def is_circuit_open(self):
+        with self._lock:
+            return time.monotonic() < self._circuit_open_until
+
+    def circuit_wait(self):
+        """Seconds until the circuit closes, 0 if it is not open."""
+        with self._lock:
+            return max(0, self._circuit_open_until - time.monotonic())
+
+    def status(self):
+        with self._lock:
+            return {
+                "endpoint": self.endpoint,
+                "circuit": "open" if time.monotonic() < self._circuit_open_until else "closed",
+                "consecutive_failures": self._consecutive_failures,
+                "requests": self.requests,
+                "failures": self.failures,
+                "throttled": self.throttled,
+                "circuit_opened_count": self.circuit_opened_count
+            }
+
+    def status_str(self):
+        status = self.status()
+        return (
+            f"{endpoint_name(status['endpoint'])}: circuit {status['circuit']}, {status['requests']} requests, "
+            f"{status['failures']} failures, {status['throttled']} throttled, "
+            f"circuit opened {status['circuit_opened_count']} times"
+        )
+
+_rpc_health = {}
+_rpc_health_lock = threading.Lock()
+def get_rpc_health(endpoint):
+    """Get the shared RpcHealth of the given endpoint uri."""
+    with _rpc_health_lock:
+        if endpoint not in _rpc_health:
+            _rpc_health[endpoint] = RpcHealth(endpoint)
+        return _rpc_health[endpoint]
+
+def all_rpc_health():
+    with _rpc_health_lock:
+        return list(_rpc_health.values())
+
+def rpc_backoff(web3, try_count, base_delay=RPC_BACKOFF_BASE, max_delay=RPC_BACKOFF_MAX):
+    """Sleep before retry number try_count of a failed request to the provider of web3.
+
+    Waits at least until one of the provider's endpoints has a closed circuit.
+    """
+    endpoint_uris = getattr(web3.provider, "endpoint_uris", [str(web3.provider.endpoint_uri)])
+    circuit_wait = min(get_rpc_health(uri).circuit_wait() for uri in endpoint_uris)
+    time.sleep(max(circuit_wait, backoff_delay(try_count, base_delay, max_delay)))
+
+def rpc_health_middleware(make_request, web3):
+    """Web3 middleware which applies the shared rate limit and circuit breaker to every request of the provider."""
+    health = get_rpc_health(str(web3.provider.endpoint_uri))
+
+    def middleware(method, params):
+        health.acquire()
+        try:
+            response = make_request(method, params)
+        except Exception as e:
+            if is_endpoint_error(method, e):
+                health.record_failure()
+            raise
+        error = response.get("error")
+        if error and is_endpoint_error(method, error):
+            health.record_failure()
+        else:
+            health.record_success()
+        return response
+    return middleware
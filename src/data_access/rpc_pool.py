@@ -0,0 +1,150 @@
+import logging
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import HTTPProvider
+
+from constants.config import *
+from data_access.rpc_health import endpoint_name, get_rpc_health, is_endpoint_error
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+def get_shared_session():
+    """Get the keep-alive http session shared by all threads and Web3 instances.
+
+    Connections to each host are pooled and reused, with at most RPC_HTTP_POOL_SIZE open per host.
+    """
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=RPC_HTTP_POOL_SIZE, pool_maxsize=RPC_HTTP_POOL_SIZE, pool_block=True)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _shared_session = session
+        return _shared_session
+
+def shared_session_stats_str():
+    """Number of connections opened versus requests sent, per host of the shared session."""
+    pool_manager = get_shared_session().get_adapter("https://").poolmanager
+    stats = []
+    for key in list(pool_manager.pools.keys()):
+        pool = pool_manager.pools.get(key)
+        if pool is None:
+            continue
+        stats.append(
+            f"{pool.host}: {pool.num_connections} connections opened for {pool.num_requests} requests "
+            f"({max(0, pool.num_requests - pool.num_connections)} reused)"
+        )
+    return ", ".join(stats) or "no connections"
+
+def post_with_shared_session(endpoint_uri, data, **kwargs):
+    """Drop in replacement of web3's make_post_request using the shared session."""
+    kwargs.setdefault("timeout", 10)
+    response = get_shared_session().post(endpoint_uri, data=data, **kwargs)
+    response.raise_for_status()
+    return response.content
+
+class EndpointStats:
+    """Rolling latency and error rate of one RPC endpoint, shared by every provider using it."""
+
+    def __init__(self, endpoint_uri, window=RPC_POOL_STATS_WINDOW):
+        self.endpoint_uri = endpoint_uri
+        self._latencies = deque(maxlen=window)
+        self._errors = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency, error=False):
+        with self._lock:
+            self._latencies.append(latency)
+            self._errors.append(error)
+
+    def latency_percentile(self, percentile):
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return 0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percentile))]
+
+    def error_rate(self):
+        with self._lock:
+            if not self._errors:
+                return 0
+            return sum(self._errors) / len(self._errors)
+
+    def score(self):
+        """Expected cost (in seconds) of a request to this endpoint, lower is better. Untried endpoints score 0."""
+        if get_rpc_health(self.endpoint_uri).is_circuit_open():
+            return float("inf")
+        expected_latency = self.latency_percentile(0.5) + 0.25 * self.latency_percentile(0.99)
+        return expected_latency + self.error_rate() * RPC_POOL_ERROR_PENALTY
+
+    def status_str(self):
+        return (
+            f"{endpoint_name(self.endpoint_uri)}: p50 {self.latency_percentile(0.5) * 1000:.0f}ms, "
+            f"p99 {self.latency_percentile(0.99) * 1000:.0f}ms, {self.error_rate():.1%} errors"
+        )
+
+_endpoint_stats = {}
+_endpoint_stats_lock = threading.Lock()
+def get_endpoint_stats(endpoint_uri):
+    with _endpoint_stats_lock:
+        if endpoint_uri not in _endpoint_stats:
+            _endpoint_stats[endpoint_uri] = EndpointStats(endpoint_uri)
+        return _endpoint_stats[endpoint_uri]
+
+def all_endpoint_stats():
+    with _endpoint_stats_lock:
+        return list(_endpoint_stats.values())
+
+class PooledHTTPProvider(HTTPProvider):
+    """HTTPProvider that routes each request to the healthiest of several endpoints.
+
+    Endpoints are ranked by their recent latency and error rate. A request that fails with an exception is
+    retried on the next best endpoint before the error is raised. Rate limiting and circuit breaking are
+    applied per endpoint through the shared RpcHealth. All requests go through the shared keep-alive session.
+    """
+
+    def __init__(self, endpoint_uris, request_kwargs=None):
+        super().__init__(endpoint_uris[0], request_kwargs)
+        self.endpoint_uris = list(endpoint_uris)
+
+    def ranked_endpoint_uris(self):
+        return sorted(self.endpoint_uris, key=lambda uri: get_endpoint_stats(uri).score())
+
+    def make_request(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        last_error = None
+        ranked_endpoint_uris = self.ranked_endpoint_uris()
+        for endpoint_uri in ranked_endpoint_uris:
+            stats = get_endpoint_stats(endpoint_uri)
+            health = get_rpc_health(endpoint_uri)
+            # Only wait on an open circuit if there is no other endpoint left to try.
+            if endpoint_uri != ranked_endpoint_uris[-1] and health.is_circuit_open():
+                continue
+            health.acquire()
+            start = time.monotonic()
+            try:
+                raw_response = post_with_shared_session(endpoint_uri, request_data, **dict(self.get_request_kwargs()))
+                response = self.decode_rpc_response(raw_response)
+            except Exception as e:
+                endpoint_error = is_endpoint_error(method, e)
+                stats.record(time.monotonic() - start, error=endpoint_error)
+                if endpoint_error:
+                    health.record_failure()
+                last_error = e
+                if len(self.endpoint_uris) > 1:
+                    logging.warning(f"RPC request {method} to {endpoint_name(endpoint_uri)} failed, trying next endpoint.\n{e}")
+                continue
+            error = response.get("error")
+            endpoint_error = bool(error) and is_endpoint_error(method, error)
+            stats.record(time.monotonic() - start, error=endpoint_error)
+            if endpoint_error:
+                health.record_failure()
+            else:
+                health.record_success()
+            return response
+        raise last_error
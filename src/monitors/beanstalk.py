@@ -3,8 +3,9 @@ from bots.util import *
 from data_access.contracts.erc20 import get_erc20_info
 from data_access.subgraphs.beanstalk import BeanstalkGraphClient
 from monitors.messages.tractor import cancel_blueprint_str, publish_requisition_str, tractor_str
-from monitors.monitor import Monitor
+from monitors.monitor import Monitor, TxnPipeline
 from data_access.contracts.util import *
+from data_access.contracts.decoded_receipt import get_decoded_receipt
 from data_access.contracts.eth_events import *
 from data_access.contracts.bean import BeanClient
 from data_access.contracts.beanstalk import BeanstalkClient
@@ -27,31 +28,32 @@ class BeanstalkMonitor(Monitor):
         super().__init__(
             "Beanstalk", None, BEANSTALK_CHECK_RATE, prod=prod, dry_run=dry_run
         )
-        self.msg_silo = msg_silo
-        self.msg_field = msg_field
-        self.msg_tractor = msg_tractor
+        self._pipeline = TxnPipeline(self.name)
+        self.msg_silo = self._pipeline.deferred(msg_silo)
+        self.msg_field = self._pipeline.deferred(msg_field)
+        self.msg_tractor = self._pipeline.deferred(msg_tractor)
         self._eth_event_client = EthEventsClient([EventClientType.BEANSTALK])
         self.beanstalk_contract = get_beanstalk_contract()
         self.tractor_executor = ThreadPoolExecutor(max_workers=30)
 
     def _monitor_method(self):
+        # No cursor was committed past a txn that failed before the restart, replay from the last one.
+        if self._pipeline.reset():
+            self._eth_event_client.replay_uncommitted()
         self.last_check_time = 0
         self.last_heartbeat_time = time.time()
         while self._thread_active:
             if time.time() - self.last_heartbeat_time > 15 * 60:
                 logging.info("BeanstalkMonitor heartbeat")
                 self.last_heartbeat_time = time.time()
-            if time.time() < self.last_check_time + self.query_rate:
-                time.sleep(0.5)
-                continue
+            self._pipeline.raise_if_failed()
+            # Wakes up as soon as new logs are streamed, otherwise checks every query_rate.
+            self._eth_event_client.wait_for_new_logs(timeout=self.query_rate)
             self.last_check_time = time.time()
-            for txn_pair in self._eth_event_client.get_new_logs(dry_run=self._dry_run):
+            for txn_pair in self._eth_event_client.get_new_logs(dry_run=self._dry_run, commit=False):
                 if len(txn_pair.logs):
-                    try:
-                        self._handle_txn_logs(txn_pair.logs)
-                    except Exception as e:
-                        logging.info(f"\n\n=> Exception during processing of txnHash {txn_pair.txn_hash.hex()}\n")
-                        raise
+                    self._pipeline.submit(txn_pair.txn_hash, self._handle_txn_logs, txn_pair.logs)
+            self._pipeline.after_dispatched(self._eth_event_client.commit_block_cursor, self._eth_event_client.pending_cursor)
 
     def _handle_txn_logs(self, event_logs):
         """Process the beanstalk event logs for a single txn.
@@ -212,19 +214,20 @@ class BeanstalkMonitor(Monitor):
                 # Occurs for referral sows
                 return ""
             effective_temp = (pods_amount / beans_amount - 1) * 100
-            max_temp = beanstalk_client.get_max_temp()
-            current_soil = beanstalk_client.get_current_soil()
+            field_info = beanstalk_client.get_field_info()
+            max_temp = field_info["max_temp"]
+            current_soil = field_info["current_soil"]
             is_morning = True
             if abs(effective_temp - max_temp) < 0.01:
                 effective_temp = max_temp
                 is_morning = False
-            is_tractor = bool(self.beanstalk_contract.events["Tractor"]().processReceipt(event_log.receipt, errors=DISCARD))
+            is_tractor = get_decoded_receipt(event_log.receipt).has_event("Tractor")
 
             emoji = "🚜" if is_tractor else "⛏️"
             event_str += (
                 f"{emoji} {round_num(beans_amount, 0, avoid_zero=True)} Pinto Sown for "
                 f"{round_num(pods_amount, 0, avoid_zero=True)} Pods "
-                f"at {round_num_abbreviated(beanstalk_client.get_podline_length(), precision=3)} in Line "
+                f"at {round_num_abbreviated(field_info['podline_length'], precision=3)} in Line "
                 f"({round_num(beans_value, 0, avoid_zero=True, incl_dollar=True)})"
                 f"\n🧑‍🌾 Farmer has {round_num_abbreviated(beanstalk_graph_client.get_farmer_pod_count(event_log.args.account), precision=1)} Pods"
             )
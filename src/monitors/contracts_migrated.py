@@ -22,9 +22,8 @@ class ContractsMigrated(Monitor):
             if time.time() - self.last_heartbeat_time > 15 * 60:
                 logging.info("ContractsMigratedMonitor heartbeat")
                 self.last_heartbeat_time = time.time()
-            if time.time() < self.last_check_time + self.query_rate:
-                time.sleep(0.5)
-                continue
+            # Wakes up as soon as new logs are streamed, otherwise checks every query_rate.
+            self._eth_event_client.wait_for_new_logs(timeout=self.query_rate)
             self.last_check_time = time.time()
             for txn_pair in self._eth_event_client.get_new_logs(dry_run=self._dry_run):
                 try:
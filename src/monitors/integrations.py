@@ -2,7 +2,7 @@ from bots.util import *
 from constants.spectra import SPECTRA_SPINTO_POOLS
 from monitors.messages.spectra import spectra_pool_str
 from monitors.messages.spinto import spinto_str
-from monitors.monitor import Monitor
+from monitors.monitor import Monitor, TxnPipeline
 from data_access.contracts.util import *
 from data_access.contracts.eth_events import *
 from data_access.util import *
@@ -16,27 +16,28 @@ class IntegrationsMonitor(Monitor):
         super().__init__(
             "Integrations", None, BEANSTALK_CHECK_RATE, prod=prod, dry_run=dry_run
         )
-        self.msg_spinto = msg_spinto
-        self.msg_spectra = msg_spectra
+        self._pipeline = TxnPipeline(self.name)
+        self.msg_spinto = self._pipeline.deferred(msg_spinto)
+        self.msg_spectra = self._pipeline.deferred(msg_spectra)
         self._eth_event_client = EthEventsClient([EventClientType.INTEGRATIONS])
 
     def _monitor_method(self):
+        # No cursor was committed past a txn that failed before the restart, replay from the last one.
+        if self._pipeline.reset():
+            self._eth_event_client.replay_uncommitted()
         self.last_check_time = 0
         self.last_heartbeat_time = time.time()
         while self._thread_active:
             if time.time() - self.last_heartbeat_time > 15 * 60:
                 logging.info("IntegrationsMonitor heartbeat")
                 self.last_heartbeat_time = time.time()
-            if time.time() < self.last_check_time + self.query_rate:
-                time.sleep(0.5)
-                continue
+            self._pipeline.raise_if_failed()
+            # Wakes up as soon as new logs are streamed, otherwise checks every query_rate.
+            self._eth_event_client.wait_for_new_logs(timeout=self.query_rate)
             self.last_check_time = time.time()
-            for txn_pair in self._eth_event_client.get_new_logs(dry_run=self._dry_run):
-                try:
-                    self._handle_txn_logs(txn_pair.logs)
-                except Exception as e:
-                    logging.info(f"\n\n=> Exception during processing of txnHash {txn_pair.txn_hash.hex()}\n")
-                    raise
+            for txn_pair in self._eth_event_client.get_new_logs(dry_run=self._dry_run, commit=False):
+                self._pipeline.submit(txn_pair.txn_hash, self._handle_txn_logs, txn_pair.logs)
+            self._pipeline.after_dispatched(self._eth_event_client.commit_block_cursor, self._eth_event_client.pending_cursor)
 
     def _handle_txn_logs(self, event_logs):
         for event_log in event_logs:
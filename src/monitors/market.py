@@ -1,8 +1,9 @@
 from data_access.contracts.beanstalk import BeanstalkClient
 
 from bots.util import *
-from monitors.monitor import Monitor
+from monitors.monitor import Monitor, TxnPipeline
 from data_access.contracts.util import *
+from data_access.contracts.decoded_receipt import get_decoded_receipt
 from data_access.contracts.eth_events import *
 from data_access.contracts.bean import BeanClient
 from data_access.subgraphs.beanstalk import BeanstalkGraphClient
@@ -17,26 +18,28 @@ class MarketMonitor(Monitor):
         super().__init__(
             "Market", message_function, BEANSTALK_CHECK_RATE, prod=prod, dry_run=dry_run
         )
+        self._pipeline = TxnPipeline(self.name)
+        self.message_function = self._pipeline.deferred(message_function)
         self._eth_event_client = EthEventsClient([EventClientType.MARKET])
         self.beanstalk_contract = get_beanstalk_contract()
 
     def _monitor_method(self):
+        # No cursor was committed past a txn that failed before the restart, replay from the last one.
+        if self._pipeline.reset():
+            self._eth_event_client.replay_uncommitted()
         self.last_check_time = 0
         self.last_heartbeat_time = time.time()
         while self._thread_active:
             if time.time() - self.last_heartbeat_time > 15 * 60:
                 logging.info("MarketMonitor heartbeat")
                 self.last_heartbeat_time = time.time()
-            if time.time() < self.last_check_time + self.query_rate:
-                time.sleep(0.5)
-                continue
+            self._pipeline.raise_if_failed()
+            # Wakes up as soon as new logs are streamed, otherwise checks every query_rate.
+            self._eth_event_client.wait_for_new_logs(timeout=self.query_rate)
             self.last_check_time = time.time()
-            for txn_pair in self._eth_event_client.get_new_logs(dry_run=self._dry_run):
-                try:
-                    self._handle_txn_logs(txn_pair.txn_hash, txn_pair.logs)
-                except Exception as e:
-                    logging.info(f"\n\n=> Exception during processing of txnHash {txn_pair.txn_hash.hex()}\n")
-                    raise
+            for txn_pair in self._eth_event_client.get_new_logs(dry_run=self._dry_run, commit=False):
+                self._pipeline.submit(txn_pair.txn_hash, self._handle_txn_logs, txn_pair.txn_hash, txn_pair.logs)
+            self._pipeline.after_dispatched(self._eth_event_client.commit_block_cursor, self._eth_event_client.pending_cursor)
 
     def _handle_txn_logs(self, txn_hash, event_logs):
         """Process the beanstalk event logs for a single txn.
@@ -44,7 +47,7 @@ class MarketMonitor(Monitor):
         Note that Event Log Object is not the same as Event object.
         """
         # Match the txn invoked method. Matching is done on the first 10 characters of the hash.
-        transaction_receipt = get_txn_receipt(self._web3, txn_hash)
+        transaction_receipt = get_txn_receipt(self._web3, txn_hash, event_logs[0].get("blockHash") if event_logs else None)
 
         # Handle txn logs individually using default strings.
         for event_log in event_logs:
@@ -64,6 +67,7 @@ class MarketMonitor(Monitor):
         bean_client = BeanClient(block_number=event_log.blockNumber)
         beanstalk_client = BeanstalkClient(block_number=event_log.blockNumber)
         beanstalk_graph_client = BeanstalkGraphClient(block_number=event_log.blockNumber)
+        decoded_receipt = get_decoded_receipt(transaction_receipt)
 
         event_str = ""
         bean_amount = 0
@@ -113,23 +117,13 @@ class MarketMonitor(Monitor):
         # If this was a pure cancel (not relist, reorder, or harvest).
         if (
             event_log.event == "PodListingCancelled"
-            and not self.beanstalk_contract.events["PodListingCreated"]().processReceipt(
-                transaction_receipt, errors=DISCARD
-            )
-            and not self.beanstalk_contract.events["PodOrderFilled"]().processReceipt(
-                transaction_receipt, errors=DISCARD
-            )
-            and not self.beanstalk_contract.events["Harvest"]().processReceipt(
-                transaction_receipt, errors=DISCARD
-            )
+            and not decoded_receipt.has_event("PodListingCreated")
+            and not decoded_receipt.has_event("PodOrderFilled")
+            and not decoded_receipt.has_event("Harvest")
         ) or (
             event_log.event == "PodOrderCancelled"
-            and not self.beanstalk_contract.events["PodOrderCreated"]().processReceipt(
-                transaction_receipt, errors=DISCARD
-            )
-            and not self.beanstalk_contract.events["PodListingFilled"]().processReceipt(
-                transaction_receipt, errors=DISCARD
-            )
+            and not decoded_receipt.has_event("PodOrderCreated")
+            and not decoded_receipt.has_event("PodListingFilled")
         ):
             if event_log.event == "PodListingCancelled":
                 listing_graph_id = event_log.args.get("lister").lower() + "-" + str(event_log.args.get("index"))
@@ -165,9 +159,7 @@ class MarketMonitor(Monitor):
         # If a new listing or relisting.
         elif event_log.event == "PodListingCreated":
             # Check if this was a relist, if so send relist message.
-            if self.beanstalk_contract.events["PodListingCancelled"]().processReceipt(
-                transaction_receipt, errors=DISCARD
-            ):
+            if decoded_receipt.has_event("PodListingCancelled"):
                 # Check if this plot was already listed before this transaction
                 listing_graph_id = event_log.args.get("lister").lower() + "-" + str(event_log.args.get("index"))
                 pod_listing = beanstalk_graph_client.get_pod_listing(listing_graph_id, block_number=event_log.blockNumber - 1)
@@ -185,9 +177,7 @@ class MarketMonitor(Monitor):
         # If a new order or reorder.
         elif event_log.event == "PodOrderCreated":
             # Check if this was a relist.
-            if self.beanstalk_contract.events["PodOrderCancelled"]().processReceipt(
-                transaction_receipt, errors=DISCARD
-            ):
+            if decoded_receipt.has_event("PodOrderCancelled"):
                 event_str += f"♻ Pods re-Ordered"
             else:
                 event_str += f"🖌 Pods Ordered"
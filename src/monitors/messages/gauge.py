@@ -3,7 +3,7 @@ from bots.util import get_logs_by_names, round_num
 from constants.addresses import BEAN_ADDR, BEANSTALK_ADDR
 from constants.config import SILO_TOKENS_MAP, WHITELISTED_WELLS
 from data_access.contracts.beanstalk import BeanstalkClient
-from data_access.contracts.eth_events import EthEventsClient, EventClientType
+from data_access.contracts.eth_events import EventClientType, get_receipt_decoder
 from data_access.contracts.util import get_web3_instance, token_to_float
 from data_access.util import execute_lambdas
 from eth_abi import decode_abi
@@ -12,9 +12,9 @@ from web3 import Web3
 
 def seasonal_gauge_str(sunrise_receipt):
     beanstalk_client = BeanstalkClient()
-    season_client = EthEventsClient([EventClientType.SEASON])
+    season_decoder = get_receipt_decoder([EventClientType.SEASON])
 
-    seasons_info = get_seasons_and_blocks(season_client.logs_from_receipt(sunrise_receipt))
+    seasons_info = get_seasons_and_blocks(season_decoder.logs_from_receipt(sunrise_receipt))
     b = seasons_info["current"]["block"]
     b_prev = seasons_info["prev"]["block"]
 
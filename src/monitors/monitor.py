@@ -1,5 +1,6 @@
 from abc import abstractmethod
 import asyncio.exceptions
+import queue
 
 from bots.util import *
 
@@ -80,3 +81,212 @@ class Monitor:
                 self.monitor_reset_delay += RESET_MONITOR_DELAY_INIT
             retry_time = time.time() + self.monitor_reset_delay
         logging.warning("Thread wrapper returned.")
+
+class StageLatency:
+    """Running latency stats of a pipeline stage."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def __str__(self):
+        avg = self.total / self.count if self.count else 0
+        return f"{avg * 1000:.0f}ms avg/{self.max * 1000:.0f}ms max"
+
+class TxnPipeline:
+    """Processes the txns of a monitor concurrently while sending their messages in on-chain order.
+
+    Stages:
+        ingest: the monitor thread submits txns in chain order. Blocks while MONITOR_PIPELINE_QUEUE_SIZE txns are
+            in the pipeline, so a stalled stage applies backpressure instead of growing memory.
+        enrich/render: a pool of workers runs the txn handler, which gathers RPC, subgraph and ENS data and renders
+            messages. Messages passed to deferred() message functions are buffered per txn rather than sent.
+        dispatch: a reorder buffer holds finished txns until all earlier txns are sent, then one thread sends
+            their messages. A txn given a timeout that is still rendering when its turn comes is sent as its
+            fallback instead, so that it does not hold back later txns.
+    """
+
+    def __init__(self, name, workers=MONITOR_PIPELINE_WORKERS, queue_size=MONITOR_PIPELINE_QUEUE_SIZE):
+        self.name = name
+        self._workers = workers
+        # Permits for txns in any stage, released once dispatched.
+        self._capacity = threading.Semaphore(queue_size)
+        self._queue = queue.Queue(maxsize=queue_size)
+        # Reorder buffer, sequence number to (messages, finish time).
+        self._finished = {}
+        self._finished_cond = threading.Condition()
+        self._next_seq = 0
+        self._next_dispatch_seq = 0
+        self._rendering = 0
+        # Sequence number to (render deadline, fallback, txn hash) of txns rendering with a timeout.
+        self._deadlines = {}
+        # Txns that were sent as their fallback, whose late messages are dropped.
+        self._abandoned = set()
+        # First txn that failed to render since the last reset. Later after_dispatched calls are skipped until then.
+        self._failed_txn = None
+        # Messages of the txn being rendered by the current worker thread.
+        self._local = threading.local()
+        self._start_lock = threading.Lock()
+        self._started = False
+
+        self.dispatched = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.queue_latency = StageLatency()
+        self.render_latency = StageLatency()
+        self.reorder_latency = StageLatency()
+
+    def deferred(self, message_function):
+        """Wrap a message function so that messages sent while rendering a txn are dispatched in order.
+
+        Calls from other threads (e.g. detached tractor handling) are sent immediately.
+        """
+        def send(*args, **kwargs):
+            messages = getattr(self._local, "messages", None)
+            if messages is not None:
+                messages.append((message_function, args, kwargs))
+            else:
+                message_function(*args, **kwargs)
+        return send
+
+    def submit(self, txn_hash, handler, *args, timeout=None, fallback=None):
+        """Queue handler(*args) to render the messages of a txn. Must be called in chain order.
+
+        If timeout (in seconds) is given and the handler is still running that long after it started, fallback()
+        is called on the dispatch thread to send reduced messages in its place. It must not block on data access.
+        """
+        self._start()
+        self._capacity.acquire()
+        self._queue.put((self._take_seq(), txn_hash, handler, args, timeout, fallback, time.time()))
+
+    def after_dispatched(self, function, *args):
+        """Call function(*args) on the dispatch thread once all txns submitted so far have been sent.
+
+        Skipped if any txn failed since the last reset, so that a block cursor is never committed past it.
+        """
+        self._start()
+        self._capacity.acquire()
+        seq = self._take_seq()
+        with self._finished_cond:
+            self._finished[seq] = ([(function, args, {})], None, None)
+            self._finished_cond.notify_all()
+
+    def raise_if_failed(self):
+        """Raise if a txn failed since the last reset, so that the monitor restarts and replays it."""
+        with self._finished_cond:
+            failed_txn = self._failed_txn
+        if failed_txn is not None:
+            raise RuntimeError(f"{self.name} txnHash {failed_txn.hex()} failed, restarting to replay it")
+
+    def reset(self):
+        """Wait until all txns submitted so far are dispatched, then clear any failure.
+
+        Returns whether a txn had failed.
+        """
+        with self._finished_cond:
+            self._finished_cond.wait_for(lambda: self._next_dispatch_seq == self._next_seq)
+            failed = self._failed_txn is not None
+            self._failed_txn = None
+            return failed
+
+    def stats_str(self):
+        with self._finished_cond:
+            buffered = len(self._finished)
+            rendering = self._rendering
+        return (
+            f"{self.dispatched} dispatched, {self.failed} failed, {self.timed_out} timed out, {self._queue.qsize()} queued, "
+            f"{rendering} rendering, {buffered} awaiting order. Queue wait {self.queue_latency}, "
+            f"render {self.render_latency}, reorder wait {self.reorder_latency}"
+        )
+
+    def _take_seq(self):
+        seq = self._next_seq
+        self._next_seq += 1
+        return seq
+
+    def _start(self):
+        with self._start_lock:
+            if self._started:
+                return
+            for i in range(self._workers):
+                threading.Thread(target=self._worker_loop, name=f"{self.name}-render-{i}", daemon=True).start()
+            threading.Thread(target=self._dispatch_loop, name=f"{self.name}-dispatch", daemon=True).start()
+            self._started = True
+
+    def _worker_loop(self):
+        while True:
+            seq, txn_hash, handler, args, timeout, fallback, submit_time = self._queue.get()
+            start_time = time.time()
+            with self._finished_cond:
+                self._rendering += 1
+                if timeout is not None:
+                    self._deadlines[seq] = (start_time + timeout, fallback, txn_hash)
+                    self._finished_cond.notify_all()
+            self._local.messages = []
+            failed = False
+            try:
+                handler(*args)
+            except Exception as e:
+                failed = True
+                logging.error(f"\n\n=> Exception during processing of txnHash {txn_hash.hex()}\n")
+                logging.warning(e, exc_info=True)
+            # Messages rendered before a failure are still sent, as they would have been without the pipeline.
+            messages = self._local.messages
+            self._local.messages = None
+            finish_time = time.time()
+            with self._finished_cond:
+                self._rendering -= 1
+                self.failed += failed
+                self.queue_latency.add(start_time - submit_time)
+                self.render_latency.add(finish_time - start_time)
+                self._deadlines.pop(seq, None)
+                if seq in self._abandoned:
+                    self._abandoned.remove(seq)
+                    logging.info(f"Dropping late {self.name} messages of txnHash {txn_hash.hex()}")
+                    continue
+                self._finished[seq] = (messages, finish_time, txn_hash if failed else None)
+                self._finished_cond.notify_all()
+
+    def _dispatch_loop(self):
+        while True:
+            with self._finished_cond:
+                seq = self._next_dispatch_seq
+                timed_out = None
+                while seq not in self._finished and timed_out is None:
+                    deadline = self._deadlines[seq][0] if seq in self._deadlines else None
+                    if deadline is None:
+                        self._finished_cond.wait()
+                    elif time.time() < deadline:
+                        self._finished_cond.wait(deadline - time.time())
+                    else:
+                        timed_out = self._deadlines.pop(seq)
+                        self._abandoned.add(seq)
+                        self.timed_out += 1
+                if timed_out is None:
+                    messages, finish_time, failed_txn = self._finished.pop(seq)
+                    if finish_time is not None:
+                        self.reorder_latency.add(time.time() - finish_time)
+                        self.dispatched += 1
+                        if failed_txn is not None and self._failed_txn is None:
+                            self._failed_txn = failed_txn
+                    elif self._failed_txn is not None:
+                        logging.warning(f"Skipping {self.name} after_dispatched call past failed txnHash {self._failed_txn.hex()}")
+                        messages = []
+                self._next_dispatch_seq += 1
+                self._finished_cond.notify_all()
+            if timed_out is not None:
+                _, fallback, txn_hash = timed_out
+                logging.warning(f"{self.name} txnHash {txn_hash.hex()} timed out while rendering, sending its fallback")
+                messages = [(fallback, (), {})] if fallback is not None else []
+            for message_function, args, kwargs in messages:
+                try:
+                    message_function(*args, **kwargs)
+                except Exception as e:
+                    logging.error(f"Failed to dispatch a {self.name} message", exc_info=True)
+            self._capacity.release()
@@ -3,6 +3,7 @@ from abc import abstractmethod
 
 from bots.util import *
 from monitors.monitor import Monitor
+from data_access.contracts.block_clock import get_block_clock
 from data_access.contracts.util import *
 from data_access.subgraphs.bean import BeanGraphClient
 from data_access.util import *
@@ -27,14 +28,18 @@ class PegCrossMonitor(Monitor):
         Note that this assumes that block time > period of graph checks.
         """
         self.last_check_time = 0
+        self.last_check_block = None
         self.last_heartbeat_time = time.time()
         while self._thread_active:
             if time.time() - self.last_heartbeat_time > 15 * 60:
                 logging.info("PegCrossMonitor heartbeat")
                 self.last_heartbeat_time = time.time()
-            if time.time() < self.last_check_time + self.query_rate:
-                time.sleep(1)
+            time.sleep(max(0, self.last_check_time + self.query_rate - time.time()))
+            # Crosses can only happen in a new block.
+            block_number = get_block_clock().wait_for_block(self.last_check_block, timeout=self.query_rate)
+            if block_number is None or block_number == self.last_check_block:
                 continue
+            self.last_check_block = block_number
             self.last_check_time = time.time()
 
             try:
@@ -2,6 +2,7 @@ from bots.util import *
 from monitors.preview.preview import PreviewMonitor
 from data_access.contracts.util import *
 from data_access.contracts.bean import BeanClient
+from data_access.contracts.well_reserves import get_well_reserve_engine
 from data_access.subgraphs.beanstalk import BeanstalkGraphClient
 from data_access.util import *
 from constants.addresses import *
@@ -18,11 +19,15 @@ class PricePreviewMonitor(PreviewMonitor):
     def _monitor_method(self):
         bean_client = BeanClient()
         beanstalk_graph_client = BeanstalkGraphClient()
+        well_reserve_engine = get_well_reserve_engine()
         while self._thread_active:
             self.wait_for_next_cycle()
             self.iterate_display_index()
 
-            price_info = bean_client.get_price_info()
+            # Locally tracked reserves reflect every block without a price contract call.
+            price_info = well_reserve_engine.latest_price_info() if well_reserve_engine else None
+            if price_info is None:
+                price_info = bean_client.get_price_info()
             bean_price = bean_client.avg_bean_price(price_info=price_info)
             delta_b = bean_client.total_delta_b(price_info=price_info)
             name_str = f"{holiday_emoji()}PINTO: ${round_num(bean_price, 4)}"
@@ -190,18 +190,10 @@ class SeasonsMonitor(Monitor):
         elif is_raining:
             rain_flood_string += f"\n\n☔ **It is Raining!** ☔"
 
-        # Well info.
-        wells_info = []
-        for well_addr in [*WHITELISTED_WELLS, *DEWHITELISTED_WELLS]:
-            wells_info.append(self.bean_latest.get_pool_info(well_addr))
-
-        # Sort highest liquidity wells first
-        wells_info = sorted(wells_info, key=lambda x: x['liquidity'], reverse=True)
-
-        total_liquidity = 0
-        for well_info in wells_info:
-            total_liquidity += token_to_float(well_info['liquidity'], 6)
-        total_liquidity = round_num(total_liquidity, 0, incl_dollar=True)
+        # Well info, all wells priced in a single call.
+        wells_prices = self.bean_latest.get_wells_price_arrays([*WHITELISTED_WELLS, *DEWHITELISTED_WELLS])
+        whitelisted_mask = wells_prices.in_wells(WHITELISTED_WELLS)
+        total_liquidity = round_num(wells_prices.total_liquidity(), 0, incl_dollar=True)
 
         wells_volume = 0
         for stats in sg.well:
@@ -231,13 +223,14 @@ class SeasonsMonitor(Monitor):
             ret_string += f"\n\n**Liquidity**"
             ret_string += f"\n🌊 :PINTO: Total Liquidity: {total_liquidity}"
 
-            for well_info in wells_info:
-                ret_string += f"\n> {SILO_TOKENS_MAP[well_info['pool'].lower()]}: ${round_num(token_to_float(well_info['liquidity'], 6), 0)} - "
-                if well_info['pool'] in WHITELISTED_WELLS:
+            # Sort highest liquidity wells first
+            for i in wells_prices.by_liquidity():
+                ret_string += f"\n> {SILO_TOKENS_MAP[wells_prices.pools[i].lower()]}: ${round_num(wells_prices.liquidity[i], 0)} - "
+                if whitelisted_mask[i]:
                     ret_string += (
-                        f"_ΔP [{round_num(token_to_float(well_info['delta_b'], 6), 0)}],_ "
+                        f"_ΔP [{round_num(wells_prices.delta_b[i], 0)}],_ "
                     )
-                ret_string += f"_price [${round_num(token_to_float(well_info['price'], 6), 4)}]_"
+                ret_string += f"_price [${round_num(wells_prices.price[i], 4)}]_"
             ret_string += f"\n⚖️ :PINTO: Hourly volume: {round_num(wells_volume, 0, incl_dollar=True)}"
 
             # Silo stats.
@@ -1,8 +1,8 @@
-from collections import defaultdict
+from collections import defaultdict, deque
 from bots.util import *
 from data_access.contracts.beanstalk import BeanstalkClient
 from data_access.contracts.erc20 import get_erc20_info
-from monitors.monitor import Monitor
+from monitors.monitor import Monitor, TxnPipeline
 from data_access.contracts.util import *
 from data_access.contracts.eth_events import *
 from data_access.contracts.bean import BeanClient
@@ -13,8 +13,10 @@ from constants.addresses import *
 from constants.config import *
 
 from typing import List, Optional
-from concurrent.futures import ThreadPoolExecutor, wait, ALL_COMPLETED
 
+from data_access.contracts.well_registry import get_well_registry
+from data_access.contracts.well_reserves import get_well_reserve_engine
+from tools.block_snapshot import get_block_snapshot
 from tools.combined_actions import withdraw_sow_info
 class WellEventData:
     def __init__(
@@ -51,6 +53,76 @@ class WellEventData:
         self.well_price_str = well_price_str
         self.well_liquidity_str = well_liquidity_str
 
+class TokenRoute:
+    """Chain of swaps where each hop sells exactly the amount bought by the previous hop."""
+
+    def __init__(self, first_hop: WellEventData):
+        self.hops: List[WellEventData] = [first_hop]
+
+    @property
+    def token_in(self):
+        return self.hops[0].token_in
+
+    @property
+    def amount_in(self):
+        return self.hops[0].amount_in
+
+    @property
+    def token_out(self):
+        return self.hops[-1].token_out
+
+    @property
+    def amount_out(self):
+        return self.hops[-1].amount_out
+
+class TokenFlowGraph:
+    """Well events of a txn, linked in a single pass into swap routes and LP moves.
+
+    A swap extends the earliest open route whose last hop bought exactly the token amount it sells, so a route
+    through any number of wells collapses into one trade from its first input to its last output. An LP addition is
+    paired with the earliest unpaired LP removal from a different well. Events not linked to any other are kept in
+    their original order.
+    """
+
+    def __init__(self, events: List[WellEventData]):
+        self.routes: List[TokenRoute] = []
+        self.lp_moves = []
+        # Routes awaiting a next hop, keyed by the (token, amount) bought by their last hop.
+        open_routes = defaultdict(deque)
+        # Unpaired LP removals of each well, in log order.
+        pending_removals = defaultdict(deque)
+        for evt in events:
+            if evt.event_type == "SWAP":
+                candidates = open_routes.get((evt.token_in, evt.amount_in))
+                if candidates:
+                    route = candidates.popleft()
+                    route.hops.append(evt)
+                else:
+                    route = TokenRoute(evt)
+                    self.routes.append(route)
+                open_routes[(evt.token_out, evt.amount_out)].append(route)
+            elif evt.event_type == "LP" and evt.token_amounts_in is None:
+                pending_removals[evt.well_address].append(evt)
+            elif evt.event_type == "LP":
+                # The number of wells is small, finding the earliest removal from another well is constant time.
+                removals = min(
+                    (removals for well, removals in pending_removals.items() if well != evt.well_address and removals),
+                    key=lambda removals: removals[0].logIndex,
+                    default=None,
+                )
+                if removals:
+                    self.lp_moves.append((removals.popleft(), evt))
+
+        linked = set()
+        for route in self.multi_hop_routes():
+            linked.update(id(hop) for hop in route.hops)
+        for removal, addition in self.lp_moves:
+            linked.update([id(removal), id(addition)])
+        self.unlinked_events: List[WellEventData] = [evt for evt in events if id(evt) not in linked]
+
+    def multi_hop_routes(self):
+        return [route for route in self.routes if len(route.hops) > 1]
+
 # Monitors all wells except those in the ignorelist
 class OtherWellsMonitor(Monitor):
     def __init__(self, msg_exchange, msg_arbitrage, ignorelist, prod=False, dry_run=None):
@@ -64,13 +136,16 @@ class OtherWellsMonitor(Monitor):
     
     def _monitor_method(self):
         self.last_check_time = 0
+        # Start loading the metadata of all wells in the background, wells are queried on demand until it is loaded.
+        well_registry = get_well_registry()
         while self._thread_active:
-            if time.time() < self.last_check_time + self.query_rate:
-                time.sleep(0.5)
-                continue
+            # Wakes up as soon as new logs are streamed, otherwise checks every query_rate.
+            self._eth_aquifer.wait_for_new_logs(timeout=self.query_rate)
             self.last_check_time = time.time()
             for txn_pair in self._eth_aquifer.get_new_logs(dry_run=self._dry_run):
                 for event_log in txn_pair.logs:
+                    if event_log.event == "BoreWell":
+                        well_registry.add_bore_well(event_log)
                     event_str = self.aquifer_event_str(event_log)
                     if event_str:
                         self.msg_exchange(event_str)
@@ -122,8 +197,10 @@ class WellsMonitor(Monitor):
 
     def __init__(self, msg_exchange, msg_arbitrage, addresses, arbitrage_senders=[], bean_reporting=False, prod=False, dry_run=None):
         super().__init__(f"specific well", None, WELL_CHECK_RATE, prod=prod, dry_run=dry_run)
-        self.msg_exchange = msg_exchange
-        self.msg_arbitrage = msg_arbitrage
+        # Txns are valued concurrently, each one's messages are sent as soon as all earlier txns are sent.
+        self._pipeline = TxnPipeline(self.name, workers=WELL_PIPELINE_WORKERS)
+        self.msg_exchange = self._pipeline.deferred(msg_exchange)
+        self.msg_arbitrage = self._pipeline.deferred(msg_arbitrage)
         self.pool_addresses = addresses
         self.arbitrage_senders = arbitrage_senders
         self._eth_event_client = EthEventsClient([EventClientType.WELL], self.pool_addresses)
@@ -134,55 +211,55 @@ class WellsMonitor(Monitor):
         self.alerted_no_recent_events = False
 
     def _monitor_method(self):
+        # No cursor was committed past a txn that failed before the restart, replay from the last one.
+        if self._pipeline.reset():
+            self._eth_event_client.replay_uncommitted()
         self.last_check_time = 0
         self.last_heartbeat_time = time.time()
+        # Start loading the metadata of all wells and tracking their reserves in the background.
+        get_well_registry()
+        get_well_reserve_engine()
         while self._thread_active:
             if time.time() - self.last_heartbeat_time > 15 * 60:
                 logging.info("WellsMonitor heartbeat")
                 self.last_heartbeat_time = time.time()
-            if time.time() < self.last_check_time + self.query_rate:
-                time.sleep(0.5)
-                continue
+            self._pipeline.raise_if_failed()
+            # Wakes up as soon as new logs are streamed, otherwise checks every query_rate.
+            self._eth_event_client.wait_for_new_logs(timeout=self.query_rate)
             self.last_check_time = time.time()
 
-            new_logs = self._eth_event_client.get_new_logs(dry_run=self._dry_run)
+            new_logs = self._eth_event_client.get_new_logs(dry_run=self._dry_run, commit=False)
             if new_logs:
                 self.last_event_time = time.time()
                 self.alerted_no_recent_events = False
 
-                BATCH_SIZE = 25
-                with ThreadPoolExecutor(max_workers=BATCH_SIZE) as executor:
-                    for i in range(0, len(new_logs), BATCH_SIZE):
-                        batch = new_logs[i:i + BATCH_SIZE]
-
-                        # Submit all tasks in the batch
-                        futures = []
-                        future_to_hash = {}
-                        for txn_pair in batch:
-                            future = executor.submit(
-                                self._handle_txn_logs,
-                                txn_pair.txn_hash,
-                                txn_pair.logs
-                            )
-                            futures.append(future)
-                            future_to_hash[future] = txn_pair.txn_hash
-                        # Wait for all futures in this batch to complete
-                        wait(futures, return_when=ALL_COMPLETED)
-
-                        # Process results in original order
-                        for future in futures:
-                            try:
-                                messages = future.result()
-                                # Submit all messages identified for this transaction
-                                for msg_fn, event_str, to_tg in messages:
-                                    msg_fn(event_str, to_tg=to_tg)
-                            except Exception as e:
-                                # Failure should be isolated to this transaction
-                                logging.error(f"\n\n=> Exception during processing of transaction: {future_to_hash[future].hex()}\n")
+                for txn_pair in new_logs:
+                    self._pipeline.submit(
+                        txn_pair.txn_hash,
+                        self._send_txn_messages,
+                        txn_pair.txn_hash,
+                        txn_pair.logs,
+                        timeout=WELL_TXN_TIMEOUT,
+                        fallback=lambda logs=txn_pair.logs: self._send_reduced_txn_message(logs)
+                    )
             elif time.time() - self.last_event_time > 30 * 60: # 30 minutes
                 if not self.alerted_no_recent_events:
                     self.alerted_no_recent_events = True
                     logging.error("\n!! No Well events encountered in the last 30 minutes. The bots may need to be restarted.")
+            self._pipeline.after_dispatched(self._eth_event_client.commit_block_cursor, self._eth_event_client.pending_cursor)
+
+    def _send_txn_messages(self, txn_hash, event_logs):
+        for msg_fn, event_str, to_tg in self._handle_txn_logs(txn_hash, event_logs):
+            msg_fn(event_str, to_tg=to_tg)
+
+    def _send_reduced_txn_message(self, event_logs):
+        """Send a message built only from the logs, for a txn that could not be valued within WELL_TXN_TIMEOUT."""
+        event_logs = [event_log for event_log in event_logs if event_log.get("address") in self.pool_addresses]
+        if not event_logs:
+            return
+        is_convert = get_decoded_receipt(event_logs[0].receipt).has_event("Convert")
+        to_tg = self.bean_reporting is False or not is_convert
+        self.msg_exchange(reduced_txn_str(event_logs), to_tg=to_tg)
 
     def _handle_txn_logs(self, txn_hash, event_logs):
         """Process the well event logs for a single txn."""
@@ -209,71 +286,42 @@ class WellsMonitor(Monitor):
                 individual_evts.append(event_data)
                 prev_log_index[address] = event_log.logIndex
 
-        # Combine trades in multiple pools into a single message
-        sum_pinto = 0
-        abs_sum_pinto = 0
-        trades = 0
-        for i in range(len(individual_evts)):
-            evt = individual_evts[i]
-            if evt.event_type not in ["SWAP", "SHIFT"]:
-                break
-            if evt.token_out == BEAN_ADDR:
-                sum_pinto += evt.amount_out
-                abs_sum_pinto += evt.amount_out
-            elif evt.token_in == BEAN_ADDR:
-                sum_pinto -= evt.amount_in
-                abs_sum_pinto += evt.amount_in
-            trades += 1
-
-        if trades > 0 and abs_sum_pinto == 0:
+        trades = [evt for evt in individual_evts if evt.event_type in ["SWAP", "SHIFT"]]
+        if len(trades) > 0 and pinto_traded(trades)[1] == 0:
             return messages
 
-        if trades >= 2:
-            # Consolidate into a single message
-            event_str = multi_trade_event_str(individual_evts)
+        graph = TokenFlowGraph(individual_evts)
+
+        # Routed trades through any number of wells, each consolidated into a single message
+        for route in graph.multi_hop_routes():
+            event_str = route_event_str(route)
             if event_str:
-                # Is considered full arbitrage even if the pinto amount mismatches by less than .1%. Some traders move
-                # light pinto profits into their trading contract.
-                if abs(sum_pinto / abs_sum_pinto) < 0.001:
+                sum_pinto, abs_sum_pinto = pinto_traded(route.hops)
+                # Same arbitrage tolerance as for consolidated trades below
+                if abs_sum_pinto > 0 and abs(sum_pinto / abs_sum_pinto) < 0.001:
                     messages.append((self.msg_arbitrage, event_str, to_tg))
                 else:
                     messages.append((self.msg_exchange, event_str, to_tg))
-            return messages
 
-        # Identify arbitrage trades or LP converts
-        i = 0
-        while i < len(individual_evts) - 1:
-            evt1 = individual_evts[i]
-            j = i + 1
-            while j < len(individual_evts):
-                evt2 = individual_evts[j]
-                # 2 well arbitrage trade: Swap/Shift where subsequent trades are selling tokens bought in earlier ones
-                # This is still identified in addition to the previous arbitrage case to account for more complex interactions
-                if (
-                    evt1.event_type in ["SWAP", "SHIFT"] and evt2.event_type in ["SWAP", "SHIFT"]
-                    and evt1.token_out == evt2.token_in and evt1.amount_out == evt2.amount_in
-                ):
-                    del individual_evts[j]
-                    del individual_evts[i]
-                    event_str = arbitrage_event_str(evt1, evt2)
+        # Moving LP (LP convert): LP removal that is followed by LP addition
+        for removal, addition in graph.lp_moves:
+            event_str = move_lp_event_str(removal, addition, is_convert=is_convert)
+            messages.append((self.msg_exchange, event_str, to_tg))
+
+        individual_evts = graph.unlinked_events
+        unlinked_trades = [evt for evt in individual_evts if evt.event_type in ["SWAP", "SHIFT"]]
+        if len(unlinked_trades) >= 2:
+            # Combine the remaining trades in multiple pools into a single message
+            event_str = multi_trade_event_str(unlinked_trades)
+            if event_str:
+                sum_pinto, abs_sum_pinto = pinto_traded(unlinked_trades)
+                # Is considered full arbitrage even if the pinto amount mismatches by less than .1%. Some traders move
+                # light pinto profits into their trading contract.
+                if abs_sum_pinto > 0 and abs(sum_pinto / abs_sum_pinto) < 0.001:
                     messages.append((self.msg_arbitrage, event_str, to_tg))
-                    break
-                # Moving LP (LP convert): LP removal that is followed by LP addition
-                elif (
-                    evt1.event_type == "LP" and evt1.token_amounts_in is None
-                    and evt2.event_type == "LP" and evt2.token_amounts_in is not None
-                    and evt1.logIndex < evt2.logIndex
-                    and evt1.well_address != evt2.well_address
-                ):
-                    del individual_evts[j]
-                    del individual_evts[i]
-                    event_str = move_lp_event_str(evt1, evt2, is_convert=is_convert)
-                    messages.append((self.msg_exchange, event_str, to_tg))
-                    break
                 else:
-                    j += 1
-            else:
-                i += 1
+                    messages.append((self.msg_exchange, event_str, to_tg))
+            individual_evts = [evt for evt in individual_evts if evt.event_type not in ["SWAP", "SHIFT"]]
 
         # Normal case
         for event_data in individual_evts:
@@ -286,11 +334,22 @@ class WellsMonitor(Monitor):
 
         return messages
 
+def reduced_txn_str(event_logs):
+    """Summary of the well events of a txn that does not query any data."""
+    event_counts = defaultdict(int)
+    for event_log in event_logs:
+        event_counts[event_log.event] += 1
+    events_str = ", ".join(f"{count} {event}" if count > 1 else event for event, count in event_counts.items())
+    txn_hash = event_logs[0].transactionHash.hex()
+    return (
+        f"🐢 Well activity - {events_str} (details unavailable)"
+        f"\n🔗 [basescan.org/tx/{shorten_hash(txn_hash)}](<https://basescan.org/tx/{txn_hash}>)"
+        f"\n_ _"
+    )
+
 def parse_event_data(event_log, prev_log_index, web3=get_web3_instance()):
-    beanstalk_client = BeanstalkClient(block_number=event_log.blockNumber)
-    bean_client = BeanClient(block_number=event_log.blockNumber)
-    basin_graph_client = BasinGraphClient(block_number=event_log.blockNumber)
-    well_client = WellClient(event_log.address)
+    # Price, bdv and liquidity data is shared by all events in the block.
+    snapshot = get_block_snapshot(event_log.blockNumber)
 
     retval = WellEventData()
     retval.receipt = event_log.receipt
@@ -311,7 +370,7 @@ def parse_event_data(event_log, prev_log_index, web3=get_web3_instance()):
     retval.amount_in = event_log.args.get("amountIn")
     retval.amount_out = event_log.args.get("amountOut")
 
-    retval.well_tokens = well_client.tokens()
+    retval.well_tokens = snapshot.well_tokens(retval.well_address)
 
     if event_log.event == "AddLiquidity":
         if tokenAmountsIn[0] == 0 and tokenAmountsIn[1] == 0:
@@ -321,10 +380,10 @@ def parse_event_data(event_log, prev_log_index, web3=get_web3_instance()):
 
         retval.event_type = "LP"
         retval.token_amounts_in = tokenAmountsIn
-        retval.bdv = token_to_float(lpAmountOut, WELL_LP_DECIMALS) * beanstalk_client.get_bdv(retval.well_address)
+        retval.bdv = token_to_float(lpAmountOut, WELL_LP_DECIMALS) * snapshot.bdv(retval.well_address)
     elif event_log.event == "Sync":
         retval.event_type = "LP"
-        deposit = basin_graph_client.get_add_liquidity_info(event_log.transactionHash, event_log.logIndex)
+        deposit = snapshot.basin_graph_client.get_add_liquidity_info(event_log.transactionHash, event_log.logIndex)
         if deposit:
             retval.token_amounts_in = list(map(int, deposit["liqReservesAmount"]))
             retval.value = float(deposit["transferVolumeUSD"])
@@ -332,7 +391,7 @@ def parse_event_data(event_log, prev_log_index, web3=get_web3_instance()):
                 return None
         else:
             # Redundancy in case subgraph is not available
-            retval.bdv = token_to_float(lpAmountOut, WELL_LP_DECIMALS) * beanstalk_client.get_bdv(retval.well_address)
+            retval.bdv = token_to_float(lpAmountOut, WELL_LP_DECIMALS) * snapshot.bdv(retval.well_address)
             if retval.bdv < 0.1:
                 return None
     elif event_log.event == "RemoveLiquidity" or event_log.event == "RemoveLiquidityOneToken":
@@ -347,7 +406,7 @@ def parse_event_data(event_log, prev_log_index, web3=get_web3_instance()):
         else:
             retval.token_amounts_out = tokenAmountsOut
 
-        retval.bdv = token_to_float(lpAmountIn, WELL_LP_DECIMALS) * beanstalk_client.get_bdv(retval.well_address)
+        retval.bdv = token_to_float(lpAmountIn, WELL_LP_DECIMALS) * snapshot.bdv(retval.well_address)
     elif event_log.event == "Swap":
         retval.event_type = "SWAP"
         if retval.token_in == BEAN_ADDR:
@@ -378,13 +437,13 @@ def parse_event_data(event_log, prev_log_index, web3=get_web3_instance()):
 
     if retval.bdv is not None:
         try:
-            retval.value = retval.bdv * bean_client.avg_bean_price()
+            retval.value = retval.bdv * snapshot.avg_bean_price()
         except Exception as e:
             logging.warning(f"Price contract failed to return a value. No value is assigned to this event")
 
-    retval.bean_price_str = latest_pool_price_str(bean_client, BEAN_ADDR)
-    retval.well_price_str = latest_pool_price_str(bean_client, retval.well_address)
-    retval.well_liquidity_str = latest_well_lp_str(basin_graph_client, retval.well_address)
+    retval.bean_price_str = snapshot.bean_price_str()
+    retval.well_price_str = snapshot.well_price_str(retval.well_address)
+    retval.well_liquidity_str = snapshot.well_liquidity_str(retval.well_address)
     return retval
 
 def single_event_str(event_data: WellEventData, bean_reporting=False, is_convert=False):
@@ -487,7 +546,7 @@ def multi_trade_event_str(all_events: List[WellEventData]):
     dollars_in = 0
     dollars_out = 0
 
-    beanstalk_client = BeanstalkClient(block_number=all_events[0].receipt.blockNumber)
+    snapshot = get_block_snapshot(all_events[0].receipt.blockNumber)
 
     # Sum totals of non-bean tokens in each well (the same well could be swapped in multiple times)
     from_tokens = defaultdict(int)
@@ -516,12 +575,12 @@ def multi_trade_event_str(all_events: List[WellEventData]):
     for nbt in from_tokens:
         erc20_info = get_erc20_info(nbt)
         from_nbt_strs.append(f"{round_token(from_tokens[nbt], erc20_info.decimals, erc20_info.addr)} {erc20_info.symbol}")
-        dollars_in += from_tokens[nbt] * beanstalk_client.get_token_usd_price(nbt) / 10 ** erc20_info.decimals
+        dollars_in += from_tokens[nbt] * snapshot.token_usd_price(nbt) / 10 ** erc20_info.decimals
 
     for nbt in to_tokens:
         erc20_info = get_erc20_info(nbt)
         to_nbt_strs.append(f"{round_token(to_tokens[nbt], erc20_info.decimals, erc20_info.addr)} {erc20_info.symbol}")
-        dollars_out += to_tokens[nbt] * beanstalk_client.get_token_usd_price(nbt) / 10 ** erc20_info.decimals
+        dollars_out += to_tokens[nbt] * snapshot.token_usd_price(nbt) / 10 ** erc20_info.decimals
 
     if len(from_nbt_strs) > 0 and len(to_nbt_strs) > 0:
         # Arbitrage running through pinto
@@ -550,38 +609,62 @@ def multi_trade_event_str(all_events: List[WellEventData]):
     event_str += links_footer(all_events[0].receipt)
     return event_str
 
-def arbitrage_event_str(evt1: WellEventData, evt2: WellEventData):
-    event_str = ""
-
-    beanstalk_client = BeanstalkClient(block_number=evt1.receipt.blockNumber)
+def pinto_traded(trades: List[WellEventData]):
+    """Net amount of pinto bought (positive) or sold (negative) by the trades, and the total amount traded."""
+    sum_pinto = 0
+    abs_sum_pinto = 0
+    for evt in trades:
+        if evt.token_out == BEAN_ADDR:
+            sum_pinto += evt.amount_out
+            abs_sum_pinto += evt.amount_out
+        elif evt.token_in == BEAN_ADDR:
+            sum_pinto -= evt.amount_in
+            abs_sum_pinto += evt.amount_in
+    return sum_pinto, abs_sum_pinto
 
-    erc20_info_in = get_erc20_info(evt1.token_in)
-    erc20_info_out = get_erc20_info(evt2.token_out)
-    erc20_info_arb = get_erc20_info(evt1.token_out)
-    amount_in_str = round_token(evt1.amount_in, erc20_info_in.decimals, erc20_info_in.addr)
-    amount_out_str = round_token(evt2.amount_out, erc20_info_out.decimals, erc20_info_out.addr)
-    amount_arb_str = round_token(evt1.amount_out, erc20_info_arb.decimals, erc20_info_arb.addr)
+def route_event_str(route: TokenRoute):
+    event_str = ""
 
-    spend_amount = evt1.amount_in * beanstalk_client.get_token_usd_price(evt1.token_in) / 10 ** erc20_info_in.decimals
-    receive_amount = evt2.amount_out * beanstalk_client.get_token_usd_price(evt2.token_out) / 10 ** erc20_info_out.decimals
+    first_hop = route.hops[0]
+    beans_in = sum(hop.amount_in for hop in route.hops if hop.token_in == BEAN_ADDR)
+    if beans_in < 100 * 10 ** BEAN_DECIMALS:
+        # Ignore small arbitrage trades
+        return None
+
+    snapshot = get_block_snapshot(first_hop.receipt.blockNumber)
+
+    erc20_info_in = get_erc20_info(route.token_in)
+    erc20_info_out = get_erc20_info(route.token_out)
+    amount_in_str = round_token(route.amount_in, erc20_info_in.decimals, erc20_info_in.addr)
+    amount_out_str = round_token(route.amount_out, erc20_info_out.decimals, erc20_info_out.addr)
+    # Amounts bought by each hop and sold by the next one
+    using_strs = []
+    for hop in route.hops[:-1]:
+        erc20_info = get_erc20_info(hop.token_out)
+        using_strs.append(f"{round_token(hop.amount_out, erc20_info.decimals, erc20_info.addr)} {erc20_info.symbol}")
+
+    spend_amount = route.amount_in * snapshot.token_usd_price(route.token_in) / 10 ** erc20_info_in.decimals
+    receive_amount = route.amount_out * snapshot.token_usd_price(route.token_out) / 10 ** erc20_info_out.decimals
     profit = receive_amount - spend_amount
     profit_str = f"{'+' if profit >= 0 else '-'}{round_num(abs(profit), 2, avoid_zero=False, incl_dollar=True)}"
 
     event_str += (
         f"{amount_in_str} {erc20_info_in.symbol} exchanged for {amount_out_str} {erc20_info_out.symbol}, "
-        f"using {amount_arb_str} {erc20_info_arb.symbol} ({profit_str})"
-        f"\n> :PINTO:📊 _{evt1.bean_price_str}_"
+        f"using {', '.join(using_strs)} ({profit_str})"
+        f"\n> :PINTO:📊 _{first_hop.bean_price_str}_"
     )
-    well1 = SILO_TOKENS_MAP.get(evt1.well_address.lower())
-    well2 = SILO_TOKENS_MAP.get(evt2.well_address.lower())
-    if well1 is not None:
-        event_str += f"\n> :{well1.upper()}:📈 _{evt1.well_price_str}_"
-    if well2 is not None:
-        event_str += f"\n> :{well2.upper()}:📉 _{evt2.well_price_str}_"
+    encountered_wells = set()
+    for hop in route.hops:
+        well = SILO_TOKENS_MAP.get(hop.well_address.lower())
+        if well is not None and well not in encountered_wells:
+            encountered_wells.add(well)
+            direction = "📈" if hop.token_out == BEAN_ADDR else "📉"
+            event_str += f"\n> :{well.upper()}:{direction} _{hop.well_price_str}_"
 
-    event_str += f"\n{value_to_emojis(evt1.value)}"
+    if first_hop.value is not None:
+        event_str += f"\n{value_to_emojis(first_hop.value)}"
 
-    event_str += links_footer(evt1.receipt)
+    event_str += links_footer(first_hop.receipt)
     return event_str
 
 def move_lp_event_str(evt1: WellEventData, evt2: WellEventData, is_convert=True):
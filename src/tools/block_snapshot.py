@@ -0,0 +1,99 @@
+import threading
+from collections import OrderedDict
+
+from bots.util import latest_pool_price_str, latest_well_lp_str
+from constants.addresses import BEAN_ADDR
+from constants.config import BLOCK_SNAPSHOT_CACHE_SIZE, DEWHITELISTED_WELLS, WHITELISTED_WELLS
+from data_access.contracts.bean import BeanClient
+from data_access.contracts.beanstalk import BeanstalkClient
+from data_access.contracts.well_registry import get_well_registry
+from data_access.contracts.well_reserves import get_well_reserve_engine
+from data_access.subgraphs.basin import BasinGraphClient
+
+class BlockSnapshot:
+    """Enrichment data at a single block, shared by every event in that block.
+
+    Each value is fetched on first use and memoized. Concurrent requests for the same value wait for a single fetch.
+    Price info of all known wells is fetched together with the overall price info in one call, or computed from the
+    reserves tracked by the WellReserveEngine.
+    """
+
+    def __init__(self, block_number):
+        self.block_number = block_number
+        self.bean_client = BeanClient(block_number=block_number)
+        self.beanstalk_client = BeanstalkClient(block_number=block_number)
+        self.basin_graph_client = BasinGraphClient(block_number=block_number)
+        self._wells = [*WHITELISTED_WELLS, *DEWHITELISTED_WELLS]
+        self._values = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def price_info(self):
+        """Overall price info, as returned by BeanClient.get_price_info."""
+        return self._price_infos()[0]
+
+    def well_pool_info(self, well):
+        """Price info of the well, as in BeanClient.get_price_info()["pool_infos"]."""
+        if well in self._wells:
+            return self._price_infos()[1]["pool_infos"][well]
+        return self._memoized(("well_pool_info", well), lambda: self.bean_client.get_pool_info(well))
+
+    def avg_bean_price(self):
+        return self.bean_client.avg_bean_price(price_info=self.price_info())
+
+    def bdv(self, token):
+        return self._memoized(("bdv", token), lambda: self.beanstalk_client.get_bdv(token))
+
+    def token_usd_price(self, token):
+        return self._memoized(("token_usd_price", token), lambda: self.beanstalk_client.get_token_usd_price(token))
+
+    def well_tokens(self, well):
+        # Tokens of a well never change, they are served by the registry rather than per block.
+        return get_well_registry().tokens(well)
+
+    def bean_price_str(self):
+        return latest_pool_price_str(self.bean_client, BEAN_ADDR, pool_info=self.price_info())
+
+    def well_price_str(self, well):
+        return latest_pool_price_str(self.bean_client, well, pool_info=self.well_pool_info(well))
+
+    def well_liquidity_str(self, well):
+        return self._memoized(("well_liquidity_str", well), lambda: latest_well_lp_str(self.basin_graph_client, well))
+
+    def _price_infos(self):
+        return self._memoized("price_infos", self._fetch_price_infos)
+
+    def _fetch_price_infos(self):
+        # Served from the locally tracked reserves when they cover this block.
+        well_reserve_engine = get_well_reserve_engine()
+        price_infos = well_reserve_engine.price_infos(self.block_number) if well_reserve_engine else None
+        return price_infos or self.bean_client.get_price_info_with_wells(self._wells)
+
+    def _memoized(self, key, fetch):
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._values:
+                    return self._values[key]
+            # Failures are not memoized, the next event in the block retries.
+            value = fetch()
+            with self._lock:
+                self._values[key] = value
+            return value
+
+_block_snapshots = OrderedDict()
+_block_snapshots_lock = threading.Lock()
+def get_block_snapshot(block_number):
+    """Get the BlockSnapshot shared by all events of the block. The most recent blocks are kept."""
+    with _block_snapshots_lock:
+        if block_number in _block_snapshots:
+            _block_snapshots.move_to_end(block_number)
+            return _block_snapshots[block_number]
+        snapshot = BlockSnapshot(block_number)
+        _block_snapshots[block_number] = snapshot
+        if len(_block_snapshots) > BLOCK_SNAPSHOT_CACHE_SIZE:
+            _block_snapshots.popitem(last=False)
+        return snapshot
@@ -1,7 +1,7 @@
 from bots.util import get_logs_by_names, round_num, round_token
 from constants.addresses import BEAN_ADDR
 from data_access.contracts.erc20 import get_erc20_info
-from data_access.contracts.eth_events import EthEventsClient, EventClientType
+from data_access.contracts.eth_events import EventClientType, get_receipt_decoder
 from data_access.contracts.tractor_events import TractorEvents
 from data_access.contracts.util import bean_to_float, pods_to_float, token_to_float
 from tools.silo import net_deposit_withdrawal_stalk
@@ -24,10 +24,10 @@ def withdraw_sow_info(receipt, logIndex):
     Identifies whether this transaction contains a simple withdrawal/sow. Does not match
     multiple withdrawaled tokens, multiple sows, or sowing from both a withdraw and external capital
     """
-    beanstalk_evt_client = EthEventsClient([EventClientType.BEANSTALK, EventClientType.WELL])
+    receipt_decoder = get_receipt_decoder([EventClientType.BEANSTALK, EventClientType.WELL])
 
     # Identify all logs within the execution context
-    txn_logs = beanstalk_evt_client.logs_from_receipt(receipt)
+    txn_logs = receipt_decoder.logs_from_receipt(receipt)
     ctx_logs = TractorEvents(receipt, txn_logs).events_matching_index(logIndex)
 
     sow_logs = get_logs_by_names("Sow", ctx_logs)
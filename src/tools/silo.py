@@ -1,10 +1,10 @@
 import logging
 from web3 import Web3
-from web3.logs import DISCARD
 from collections import defaultdict
 from bots.util import get_logs_by_names
 from data_access.contracts.beanstalk import BeanstalkClient
-from data_access.contracts.util import get_erc1155_contract, get_web3_instance
+from data_access.contracts.decoded_receipt import get_decoded_receipt
+from data_access.contracts.util import erc1155_abi, get_web3_instance
 
 class StemTipCache(object):
     def __init__(self, block_number="latest"):
@@ -82,15 +82,8 @@ def net_deposit_withdrawal_stalk(event_logs, remove_from_logs=False):
 
 def net_erc1155_transfers(token, owner, receipt):
     """Returns the net transfer amount of token from/to owner in the given transaction"""
-    erc1155_contract = get_erc1155_contract(token)
-
-    event_names = ["TransferSingle", "TransferBatch"]
-    all_events = []
-
-    for event_name in event_names:
-        event_obj = getattr(erc1155_contract.events, event_name)()
-        processed_events = event_obj.processReceipt(receipt, errors=DISCARD)
-        all_events.extend(processed_events)
+    # Like processReceipt, events are matched by topic regardless of the emitting contract.
+    all_events = get_decoded_receipt(receipt).events(["TransferSingle", "TransferBatch"], abi=erc1155_abi)
 
     # Filter events
     owner_evts = [evt for evt in all_events if evt.args.get("from") == owner or evt.args.get("to") == owner]
@@ -1,7 +1,6 @@
-from constants.addresses import SPINTO_ADDR
-from data_access.contracts.util import get_beanstalk_contract, get_wrapped_silo_contract
+from data_access.contracts.decoded_receipt import get_decoded_receipt
+from data_access.contracts.util import wrapped_silo_erc20_abi
 from tools.silo import StemTipCache, net_erc1155_transfers, unpack_address_and_stem
-from web3.logs import DISCARD
 
 
 def spinto_deposit_info(wrapped_info, owner, event_log):
@@ -10,14 +9,14 @@ def spinto_deposit_info(wrapped_info, owner, event_log):
     on the deposit which was added/removed to spinto
     """
 
-    beanstalk_contract = get_beanstalk_contract()
+    decoded_receipt = get_decoded_receipt(event_log.receipt)
 
     stalk = 0
     stem_tips = StemTipCache(block_number=event_log.blockNumber)
     farmer_transfers = net_erc1155_transfers(wrapped_info.addr, owner, event_log.receipt)
     if len(farmer_transfers) > 0:
         is_deposited = True
-        evt_add_deposit = beanstalk_contract.events["AddDeposit"]().processReceipt(event_log.receipt, errors=DISCARD)
+        evt_add_deposit = decoded_receipt.events("AddDeposit")
         # Silo wrap/unwrap: in both directions, use the IDs from 1155 transfer events
         for id in farmer_transfers:
             token, stem = unpack_address_and_stem(id)
@@ -39,8 +38,8 @@ def spinto_deposit_info(wrapped_info, owner, event_log):
             stalk = 10 ** 10 * event_log.args.get("assets")
         else:
             # Direct unwrap: analyze all of the Remove events after the final AddDeposit event
-            evt_add_deposit = beanstalk_contract.events["AddDeposit"]().processReceipt(event_log.receipt, errors=DISCARD)
-            evt_remove_deposits = beanstalk_contract.events["RemoveDeposits"]().processReceipt(event_log.receipt, errors=DISCARD)
+            evt_add_deposit = decoded_receipt.events("AddDeposit")
+            evt_remove_deposits = decoded_receipt.events("RemoveDeposits")
 
             max_deposit_idx = max((evt.logIndex for evt in evt_add_deposit), default=0)
             evt_remove_deposits = [evt for evt in evt_remove_deposits if evt.logIndex > max_deposit_idx]
@@ -57,7 +56,7 @@ def spinto_deposit_info(wrapped_info, owner, event_log):
 
 def has_spinto_action_size(receipt, amount):
     """Returns true if the given transaction receipt contains a spinto deposit/withdraw of the given size"""
-    spinto_contract = get_wrapped_silo_contract(SPINTO_ADDR)
+    decoded_receipt = get_decoded_receipt(receipt)
 
     def sum_assets(events):
         retval = 0
@@ -66,8 +65,8 @@ def has_spinto_action_size(receipt, amount):
         return retval
 
     if amount > 0:
-        deposits = spinto_contract.events["Deposit"]().processReceipt(receipt, errors=DISCARD)
+        deposits = decoded_receipt.events("Deposit", abi=wrapped_silo_erc20_abi)
         return sum_assets(deposits) == amount
     else:
-        withdraws = spinto_contract.events["Withdraw"]().processReceipt(receipt, errors=DISCARD)
+        withdraws = decoded_receipt.events("Withdraw", abi=wrapped_silo_erc20_abi)
         return sum_assets(withdraws) == abs(amount)
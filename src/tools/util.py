@@ -1,18 +1,24 @@
 import re
-from constants.config import DISCORD_TOKEN_EMOJIS
+from collections import OrderedDict
+from constants.config import DISCORD_TOKEN_EMOJIS, RECEIPT_BATCH_SIZE, RECEIPT_CACHE_SIZE
+from data_access.rpc_health import backoff_delay, get_rpc_health, rpc_health_middleware
+from data_access.rpc_pool import get_shared_session
 from hexbytes.main import HexBytes
 import logging
 import os
+import threading
 import time
 from web3 import Web3, WebsocketProvider
+from web3._utils.method_formatters import receipt_formatter
 from web3.datastructures import AttributeDict
 from web3.logs import DISCARD
 
 from datetime import datetime
 
 
-URL = "wss://" + os.environ["RPC_URL"]
+URL = "wss://" + os.environ["RPC_URL"].split(",")[0].strip()
 web3 = Web3(WebsocketProvider(URL, websocket_timeout=60))
+web3.middleware_onion.add(rpc_health_middleware)
 
 
 def noop(*args, **kwargs):
@@ -55,7 +61,7 @@ def retryable(max_retries=5, retry_delay=10, show_retry_error=True):
                     if try_count < max_retries:
                         if show_retry_error:
                             logging.warning(f"Failed to get result. Retrying...\n{e}")
-                        time.sleep(retry_delay)
+                        time.sleep(backoff_delay(try_count, max_delay=retry_delay))
                         continue
                     logging.error(
                         f"Failed to get result after {try_count} retries."
@@ -64,16 +70,161 @@ def retryable(max_retries=5, retry_delay=10, show_retry_error=True):
         return retry_wrapper
     return decorator
 
-@retryable()
-def get_txn_receipt(web3, txn_hash):
+class ReceiptCache:
+    """Thread-safe LRU cache of txn receipts keyed by txn hash.
+
+    A reorg can include the txn in another block, with different logs. Each entry keeps the hash of the block the
+    receipt belongs to, and is evicted when it does not match the block of the log being processed.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._receipts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, txn_hash, block_hash=None):
+        """Return the cached receipt for txn_hash, or None if it is not cached.
+
+        If block_hash is given a receipt from any other block is stale, it is evicted and None is returned.
+        """
+        key = HexBytes(txn_hash).hex()
+        with self._lock:
+            entry = self._receipts.get(key)
+            if entry is not None and block_hash is not None and entry[1] != HexBytes(block_hash).hex():
+                del self._receipts[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._receipts.move_to_end(key)
+            return entry[0]
+
+    def put(self, receipt):
+        key = HexBytes(receipt.transactionHash).hex()
+        block_hash = receipt.get("blockHash")
+        with self._lock:
+            self._receipts[key] = (receipt, HexBytes(block_hash).hex() if block_hash is not None else None)
+            self._receipts.move_to_end(key)
+            while len(self._receipts) > self.max_size:
+                self._receipts.popitem(last=False)
+
+    def stats_str(self):
+        with self._lock:
+            total = self.hits + self.misses
+            hit_rate = self.hits / total if total else 0
+            return f"{len(self._receipts)} cached, {self.hits} hits, {self.misses} misses ({hit_rate:.1%} hit rate)"
+
+receipt_cache = ReceiptCache(RECEIPT_CACHE_SIZE)
+
+def get_txn_receipt(web3, txn_hash, block_hash=None):
     """
     Get the transaction receipt and handle errors and block delays cleanly.
+    Receipts are shared with all other callers through receipt_cache. Pass the block_hash of the log being processed
+    so that a receipt cached before a reorg is not served.
 
     Returns:
         AttributeDict containing a single txn receipt.
     """
+    receipt = receipt_cache.get(txn_hash, block_hash)
+    if receipt is None:
+        receipt = fetch_txn_receipt(web3, txn_hash)
+        receipt_cache.put(receipt)
+    return receipt
+
+@retryable()
+def fetch_txn_receipt(web3, txn_hash):
+    """Get the transaction receipt from the chain, bypassing the cache."""
     return web3.eth.get_transaction_receipt(txn_hash)
 
+def get_txn_receipts(web3, txn_hashes, block_number=None, block_hashes=None):
+    """
+    Get the receipts of many transactions with as few requests as possible.
+
+    Receipts which are not cached are fetched with eth_getBlockReceipts when they all belong to
+    block_number, otherwise with a single JSON-RPC batch request. Falls back to individual requests
+    if the provider rejects either. block_hashes optionally maps txn hash (hex str) to the hash of the
+    block of the logs being processed, cached receipts from any other block are refetched.
+
+    Returns:
+        dict of txn hash (hex str) to receipt AttributeDict.
+    """
+    receipts = {}
+    missing = []
+    for txn_hash in txn_hashes:
+        key = HexBytes(txn_hash).hex()
+        receipt = receipt_cache.get(key, (block_hashes or {}).get(key))
+        if receipt is None:
+            missing.append(key)
+        else:
+            receipts[key] = receipt
+
+    if len(missing) > 1:
+        # A whole block is fetched at once, otherwise batches are limited in size.
+        batch_size = len(missing) if block_number is not None else RECEIPT_BATCH_SIZE
+        for i in range(0, len(missing), batch_size):
+            try:
+                fetched = fetch_txn_receipts_batch(web3, missing[i:i + batch_size], block_number)
+            except Exception as e:
+                logging.warning(f"Batched receipt request failed, falling back to individual requests.\n{e}")
+                fetched = {}
+            for key, receipt in fetched.items():
+                receipt_cache.put(receipt)
+                receipts[key] = receipt
+
+    for key in missing:
+        if key not in receipts:
+            receipts[key] = fetch_txn_receipt(web3, key)
+            receipt_cache.put(receipts[key])
+    return receipts
+
+def fetch_txn_receipts_batch(web3, txn_hashes, block_number=None):
+    """Get the receipts of the given transactions in one request. Only supported for http providers.
+
+    Returns:
+        dict of txn hash (hex str) to receipt AttributeDict. Receipts that were not found are omitted.
+    """
+    if hasattr(web3.provider, "ranked_endpoint_uris"):
+        endpoint_uri = web3.provider.ranked_endpoint_uris()[0]
+    else:
+        endpoint_uri = getattr(web3.provider, "endpoint_uri", None)
+    if not endpoint_uri or not str(endpoint_uri).startswith("http"):
+        return {}
+
+    health = get_rpc_health(str(endpoint_uri))
+    raw_receipts = None
+    if block_number is not None:
+        health.acquire()
+        response = get_shared_session().post(endpoint_uri, json={
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "eth_getBlockReceipts",
+            "params": [hex(block_number)]
+        }, timeout=30).json()
+        if response.get("result"):
+            wanted = set(txn_hashes)
+            raw_receipts = [r for r in response["result"] if r["transactionHash"] in wanted]
+        else:
+            logging.info(f"eth_getBlockReceipts unavailable, using batch request instead: {response.get('error')}")
+
+    if raw_receipts is None:
+        health.acquire()
+        response = get_shared_session().post(endpoint_uri, json=[
+            {"jsonrpc": "2.0", "id": i, "method": "eth_getTransactionReceipt", "params": [txn_hash]}
+            for i, txn_hash in enumerate(txn_hashes)
+        ], timeout=30).json()
+        if not isinstance(response, list):
+            raise ValueError(f"Batch request rejected by provider: {response}")
+        raw_receipts = [r["result"] for r in response if r.get("result")]
+
+    receipts = {}
+    for raw_receipt in raw_receipts:
+        receipt = AttributeDict.recursive(receipt_formatter(raw_receipt))
+        receipts[HexBytes(receipt.transactionHash).hex()] = receipt
+    return receipts
+
 def format_farm_call_str(decoded_txn, beanstalk_contract):
     """Break down a farm() call and return a list of the sub-method it calls.
 